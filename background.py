@@ -0,0 +1,65 @@
+"""Build expensive figures on a bounded worker pool instead of in the script run.
+
+A session holds at most one job per slot (one per chart position). Submitting different
+arguments to a slot cancels the job it replaces if it has not started yet; a job that is
+already running finishes in the background, where its figure still lands in the figure cache,
+but the session no longer waits for it. `finish_run` cancels the jobs of slots the run did not
+use, e.g. after the user switched to a different chart. Once a job's figure has been shown the
+slot is released, so only pending jobs are kept and later reruns go through the figure cache.
+
+Workers are threads: the builders spend most of their time in pandas and NumPy, and the
+figures they return are shared through the in-process figure cache.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+BACKGROUND_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix='figure')
+        return _executor
+
+
+def _jobs():
+    return st.session_state.setdefault('background_jobs', {})
+
+
+def start_run():
+    st.session_state['background_slots_used'] = set()
+
+
+def submit(slot, build, *args):
+    """Return the future for `build(*args)` in this session's `slot`, starting it if needed."""
+    jobs = _jobs()
+    key = (build, args)
+    job = jobs.get(slot)
+    if job is None or job[0] != key:
+        if job is not None:
+            job[1].cancel()
+        job = jobs[slot] = (key, _get_executor().submit(build, *args))
+    st.session_state.setdefault('background_slots_used', set()).add(slot)
+    return job[1]
+
+
+def release(slot, future):
+    """Forget `slot` once its job's result has been used, unless a newer job replaced it."""
+    jobs = _jobs()
+    if slot in jobs and jobs[slot][1] is future:
+        del jobs[slot]
+
+
+def finish_run():
+    """Cancel and forget the jobs of every slot this run did not submit to."""
+    jobs = _jobs()
+    used = st.session_state.get('background_slots_used', set())
+    for slot in [slot for slot in jobs if slot not in used]:
+        jobs.pop(slot)[1].cancel()
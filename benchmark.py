@@ -0,0 +1,141 @@
+"""Headless benchmark of every dashboard view against a synthetic panel.
+
+Usage: `python benchmark.py [--countries N] [--years N] [--metrics N] [--repeat N]`
+
+A panel of the requested size is written to a temporary CSV and the dashboard is pointed at
+it through SOCIOECON_DATA_SOURCE. Each view is then driven through Streamlit's AppTest, in
+this process, and the report lists the cold data load time and, per view, the first render
+(empty figure cache), the median warm rerun, the peak traced memory of a render and the
+bytes of Plotly JSON the view sends to the browser.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+import data_loader
+import figures
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'midterm.py')
+
+# Columns the views read by name; any further metrics are filled with generic columns.
+REQUIRED_METRICS = [
+    'gdp_per_capita_usd', 'population_millions', 'life_expectancy_years', 'co2_emissions_million_metric_tons',
+    'energy_consumption_twh', 'renewable_energy_share', 'education_expenditure_gdp',
+    'healthcare_expenditure_per_capita_usd', 'military_expenditure_billion_usd',
+    'agriculture_hunting_forestry_fishing_pct_gross', 'industry_pct_gross', 'services_pct_gross',
+    'internet_penetration', 'smartphone_adoption', 'imports_millions_usd', 'exports_millions_usd',
+    'hdi', 'gender_equality_index', 'corruption_perception_index', 'freedom_of_press_index',
+    'population_growth_rate', 'unemployment_rate', 'poverty_rate', 'forest_coverage', 'inflation_rate',
+    'voting_participation_rate',
+]
+
+# (label, view, number of Sandbox metrics selected)
+SCENARIOS = [
+    ('Documentation', 'Documentation', 0),
+    ('Country View', 'Country View', 0),
+    ('Stats View', 'Stats View', 0),
+    ('Sandbox, 1 metric', 'Sandbox Mode', 1),
+    ('Sandbox, 2 metrics', 'Sandbox Mode', 2),
+    ('Sandbox, 3 metrics', 'Sandbox Mode', 3),
+    ('Sandbox, 5 metrics', 'Sandbox Mode', 5),
+]
+
+
+def synthetic_panel(countries, years, metrics, seed=0):
+    """A country-year panel with every column the views use, plus generic metrics up to `metrics`.
+
+    Values are positive so the log-scale charts stay valid.
+    """
+    rng = np.random.default_rng(seed)
+    names = REQUIRED_METRICS + [f'metric_{i}' for i in range(max(0, metrics - len(REQUIRED_METRICS)))]
+    rows = countries * years
+    data = {
+        'country': np.repeat([f'Country {i:04d}' for i in range(countries)], years),
+        'year': np.tile(np.arange(2000, 2000 + years), countries),
+    }
+    for name in names:
+        data[name] = rng.uniform(1, 100, rows)
+    return pd.DataFrame(data)
+
+
+def select_view(app, view, metric_count):
+    app.sidebar.radio[0].set_value(view)
+    if metric_count:
+        # Selecting metrics needs the Sandbox widgets, which only exist after a run in that view.
+        app.run()
+        metrics = next(widget for widget in app.multiselect if widget.label == "Select Metrics")
+        metrics.set_value(metrics.options[:metric_count])
+
+
+def run(app):
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+
+
+def payload_bytes(app):
+    return sum(len(chart.proto.figure.spec) for chart in app.get('plotly_chart'))
+
+
+def benchmark_view(view, metric_count, repeat):
+    figures.clear_cache()
+    app = AppTest.from_file(APP_PATH, default_timeout=600)
+    run(app)
+    select_view(app, view, metric_count)
+
+    start = time.perf_counter()
+    run(app)
+    first = time.perf_counter() - start
+
+    reruns = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(app)
+        reruns.append(time.perf_counter() - start)
+
+    # Traced separately so tracemalloc's overhead does not skew the timings.
+    figures.clear_cache()
+    tracemalloc.start()
+    run(app)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return first, statistics.median(reruns), peak, payload_bytes(app)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--countries', type=int, default=12)
+    parser.add_argument('--years', type=int, default=12)
+    parser.add_argument('--metrics', type=int, default=len(REQUIRED_METRICS))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, 'working_df.csv')
+        synthetic_panel(args.countries, args.years, args.metrics).to_csv(source, index=False)
+        os.environ[data_loader.SOURCE_ENV_VAR] = source
+
+        data_loader.clear_cache()
+        start = time.perf_counter()
+        panel = data_loader.load_panel()
+        load = time.perf_counter() - start
+
+        print(f"Panel: {len(panel.countries)} countries x {len(panel.years)} years x {args.metrics} metrics "
+              f"({len(panel.data):,} rows), loaded in {load * 1000:.1f} ms")
+        print(f"{'View':<22}{'first (ms)':>12}{'rerun (ms)':>12}{'peak (MiB)':>12}{'payload (KiB)':>15}")
+        for label, view, metric_count in SCENARIOS:
+            first, rerun, peak, payload = benchmark_view(view, metric_count, args.repeat)
+            print(f"{label:<22}{first * 1000:>12.1f}{rerun * 1000:>12.1f}{peak / 2**20:>12.1f}{payload / 1024:>15.1f}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,145 @@
+"""Pairwise relationships between every numeric metric, pooled and per country.
+
+For a selection of countries and a year range, `relationships` returns one row per
+(country, x, y) pair with the number of joint observations, the Pearson and Spearman
+correlations, and the least-squares fit of y on x. Pooled rows use the country `ALL`.
+
+All pairs of a group come out of a handful of matrix products over the group's values, with
+missing values handled pairwise. Spearman ranks each metric once over its present values, so it
+matches pandas exactly when the metrics have no gaps. Groups are spread over a process pool
+once the selection has `PARALLEL_MIN_ROWS` rows. Results are memoized on
+(panel, countries, years).
+"""
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+import profiling
+from derived import lineage
+
+ALL = 'All countries'
+
+RELATIONSHIP_CACHE_SIZE = 64
+PARALLEL_MIN_ROWS = 200_000
+
+# Pairs with fewer joint observations than this are left out of the rankings.
+MIN_OBSERVATIONS = 5
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pair_stats(values):
+    """Joint counts, Pearson r, and slope and intercept of column j on column i, for all (i, j).
+
+    `values` is an (observations x metrics) float array with NaN for missing values; each pair
+    only uses the rows where both metrics are present.
+    """
+    present = ~np.isnan(values)
+    weights = present.astype(np.float64)
+    filled = np.where(present, values, 0.0)
+    means = filled.sum(axis=0) / np.maximum(weights.sum(axis=0), 1)
+    # Centering leaves every statistic unchanged and keeps the sums of squares well conditioned.
+    centered = np.where(present, filled - means, 0.0)
+
+    count = weights.T @ weights
+    sum_x = centered.T @ weights
+    sum_y = sum_x.T
+    sum_xx = (centered * centered).T @ weights
+    sum_yy = sum_xx.T
+    sum_xy = centered.T @ centered
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sum_xy - sum_x * sum_y / count
+        var_x = sum_xx - sum_x * sum_x / count
+        var_y = sum_yy - sum_y * sum_y / count
+        pearson = cov / np.sqrt(var_x * var_y)
+        slope = cov / var_x
+        # Shift the intercept of the centered fit back to the original units.
+        intercept = (sum_y - slope * sum_x) / count + means[None, :] - slope * means[:, None]
+    return count, pearson, slope, intercept
+
+
+def group_stats(values):
+    count, pearson, slope, intercept = pair_stats(values)
+    ranks = pd.DataFrame(values).rank().to_numpy()
+    spearman = pair_stats(ranks)[1]
+    return count, pearson, spearman, slope, intercept
+
+
+def _stats_for_groups(groups):
+    return [(name, group_stats(values)) for name, values in groups]
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned rather than forked: the dashboard process runs many threads.
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+@functools.lru_cache(maxsize=RELATIONSHIP_CACHE_SIZE)
+@profiling.timed('correlate')
+def relationships(panel, countries, years):
+    names = panel.metrics
+    selected = panel.select(countries, years)
+    values = selected[names].to_numpy(dtype=np.float64)
+    codes, uniques = pd.factorize(selected['country'], sort=False)
+    groups = [(ALL, values)] + [(country, values[codes == code]) for code, country in enumerate(uniques)]
+
+    if len(selected) >= PARALLEL_MIN_ROWS and len(groups) > 2:
+        workers = os.cpu_count() or 1
+        chunks = [groups[i::workers] for i in range(workers)]
+        results = [result for chunk in _get_pool().map(_stats_for_groups, chunks) for result in chunk]
+    else:
+        results = _stats_for_groups(groups)
+
+    upper = np.triu_indices(len(names), 1)
+    x = np.asarray(names, dtype=object)[upper[0]]
+    y = np.asarray(names, dtype=object)[upper[1]]
+    frames = []
+    for country, (count, pearson, spearman, slope, intercept) in results:
+        frames.append(pd.DataFrame({
+            'country': country, 'x': x, 'y': y,
+            'n': count[upper].astype(np.int64),
+            'pearson': pearson[upper], 'spearman': spearman[upper],
+            'slope': slope[upper], 'intercept': intercept[upper],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def correlation_matrix(panel, countries, years, method='pearson'):
+    """The pooled metric-by-metric correlation matrix for the selection."""
+    pooled = relationships(panel, countries, years)
+    pooled = pooled[pooled['country'] == ALL]
+    names = panel.metrics
+    positions = pd.Index(names)
+    matrix = np.eye(len(names))
+    rows, cols = positions.get_indexer(pooled['x']), positions.get_indexer(pooled['y'])
+    matrix[rows, cols] = matrix[cols, rows] = pooled[method].to_numpy()
+    return pd.DataFrame(matrix, index=names, columns=names)
+
+
+def strongest(panel, countries, years, method='pearson', country=ALL, top=20):
+    """The `top` pairs with the largest absolute correlation for a country (or pooled).
+
+    Pairs where one metric is computed from the other (see derived.py) are left out: they
+    correlate by construction.
+    """
+    pairs = relationships(panel, countries, years)
+    pairs = pairs[(pairs['country'] == country) & (pairs['n'] >= MIN_OBSERVATIONS)].dropna(subset=[method])
+    by_formula = [x in lineage(y) or y in lineage(x) for x, y in zip(pairs['x'], pairs['y'])]
+    pairs = pairs[~np.asarray(by_formula, dtype=bool)]
+    return pairs.loc[pairs[method].abs().sort_values(ascending=False).index[:top]].reset_index(drop=True)
+
+
+# Results hold the panel in their key; drop them once it has been replaced.
+data_loader.on_retire(lambda panel: relationships.cache_clear())
@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+import urllib.request
+
+import pandas as pd
+
+import panel_store
+import snapshot
+from derived import add_derived, drop_derived
+from panel import Panel
+
+# Local copy shipped alongside the app; the GitHub raw URL is only used as a fallback.
+DEFAULT_LOCAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'working_df.csv')
+DEFAULT_REMOTE_URL = 'https://raw.githubusercontent.com/Vennamm/SocioEconomic-Analysis-of-Developing-Countries/main/working_df.csv'
+
+# Set this to a path or URL to point the dashboard at a different copy of the working dataset.
+SOURCE_ENV_VAR = 'SOCIOECON_DATA_SOURCE'
+
+# Remote sources are re-validated at most this often (seconds) instead of on every rerun.
+REMOTE_CHECK_INTERVAL = 300
+
+# Directory of append-only delta CSVs merged over the working dataset. Defaults to a `deltas`
+# folder next to a local source; remote sources only get deltas when this is set.
+DELTA_DIR_ENV_VAR = 'SOCIOECON_DELTA_DIR'
+DELTA_KEY = ['country', 'year']
+
+_cache = {}
+_panels = {}
+_retire_hooks = []
+_cache_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+
+def on_retire(hook):
+    """Call `hook(panel)` whenever a panel is replaced by a newer one, so caches keyed on it can drop it."""
+    _retire_hooks.append(hook)
+
+
+def _retire(panel):
+    panel.retired = True
+    for hook in _retire_hooks:
+        hook(panel)
+
+
+def is_remote(source):
+    return source.startswith(('http://', 'https://'))
+
+
+def resolve_source(source=None):
+    """Pick the data source: explicit argument, then the env var, then the local file, then the URL.
+
+    A local CSV is swapped for its panel store, or else its Feather snapshot, when one exists
+    and is not older than the CSV.
+    """
+    if source:
+        return source
+    if os.environ.get(SOURCE_ENV_VAR):
+        return os.environ[SOURCE_ENV_VAR]
+    if os.path.exists(DEFAULT_LOCAL_PATH):
+        for derived_path in (panel_store.store_path_for(DEFAULT_LOCAL_PATH), snapshot.snapshot_path_for(DEFAULT_LOCAL_PATH)):
+            if os.path.exists(derived_path) and os.path.getmtime(derived_path) >= os.path.getmtime(DEFAULT_LOCAL_PATH):
+                return derived_path
+        return DEFAULT_LOCAL_PATH
+    return DEFAULT_REMOTE_URL
+
+
+def source_version(source):
+    """Return a token that changes whenever the underlying data changes.
+
+    Local files use (mtime, size); remote files use the ETag / Last-Modified headers.
+    Returns None when no version can be determined, in which case the cached copy is kept.
+    """
+    if not is_remote(source):
+        stat = os.stat(source)
+        return (stat.st_mtime_ns, stat.st_size)
+    try:
+        request = urllib.request.Request(source, method='HEAD')
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.headers.get('ETag') or response.headers.get('Last-Modified')
+    except OSError:
+        return None
+
+
+def read_source(source):
+    if panel_store.is_store(source):
+        return panel_store.attach_store(source)
+    if snapshot.is_snapshot(source):
+        return snapshot.load_snapshot(source)
+    return pd.read_csv(source)
+
+
+def load_working_data(source=None):
+    """Load the working dataset, memoized process-wide on (source, version).
+
+    Every session gets the same DataFrame object back, so callers must treat it as
+    read-only and take a copy before adding or modifying columns. The version check and the
+    read happen outside the cache lock, so one slow reload or revalidation does not hold up
+    the sessions that are served from the cache.
+    """
+    source = resolve_source(source)
+
+    with _cache_lock:
+        cached = _cache.get(source)
+    if cached is not None and is_remote(source) and time.monotonic() - cached[2] < REMOTE_CHECK_INTERVAL:
+        return cached[1]
+
+    version = source_version(source)
+    if cached is not None and (version is None or cached[0] == version):
+        with _cache_lock:
+            if _cache.get(source) is cached:
+                _cache[source] = (cached[0], cached[1], time.monotonic())
+        return cached[1]
+
+    data = read_source(source)
+    with _cache_lock:
+        current = _cache.get(source)
+        if current is not None and current is not cached and current[0] == version:
+            # Another thread loaded the same version meanwhile; share its frame so panels match.
+            return current[1]
+        _cache[source] = (version, data, time.monotonic())
+    return data
+
+
+def delta_dir(source):
+    if os.environ.get(DELTA_DIR_ENV_VAR):
+        return os.environ[DELTA_DIR_ENV_VAR]
+    if is_remote(source):
+        return None
+    return os.path.join(os.path.dirname(os.path.abspath(source)), 'deltas')
+
+
+def list_deltas(directory):
+    """The delta files in apply order (by name), each with its version token."""
+    if directory is None or not os.path.isdir(directory):
+        return ()
+    names = sorted(name for name in os.listdir(directory) if name.endswith('.csv'))
+    return tuple((name, source_version(os.path.join(directory, name))) for name in names)
+
+
+def read_delta(path):
+    delta = pd.read_csv(path)
+    missing = [column for column in DELTA_KEY if column not in delta.columns]
+    if missing:
+        raise ValueError(f"{path}: delta files need {missing} columns")
+    return delta
+
+
+def revised_rows(data, delta):
+    """Mask of the rows of `data` whose (country, year) the delta also has."""
+    return pd.MultiIndex.from_frame(data[DELTA_KEY]).isin(pd.MultiIndex.from_frame(delta[DELTA_KEY]))
+
+
+def apply_delta(data, delta):
+    """Merge a delta into the working dataset, keyed by (country, year).
+
+    Rows for new keys are appended. For existing keys the delta's non-missing values replace
+    the current ones, so a delta only needs the columns it revises. Columns the dataset does
+    not have yet are added.
+    """
+    delta = delta.drop_duplicates(DELTA_KEY, keep='last')
+    revised = revised_rows(data, delta)
+
+    columns = list(data.columns) + [column for column in delta.columns if column not in data.columns]
+    merged_rows = (pd.concat([data[revised], delta], ignore_index=True)
+                   .groupby(DELTA_KEY, sort=False, observed=True).last().reset_index())
+    return pd.concat([data[~revised], merged_rows], ignore_index=True)[columns]
+
+
+def load_panel(source=None):
+    """Return the indexed Panel for the working dataset with its deltas applied.
+
+    The panel is rebuilt only when the data is reloaded or a delta file appears or changes.
+    New delta files are merged into the current panel's data in memory; the base file is only
+    re-read when it changed itself. Every rebuilt panel gets the next `version`, and the swap is
+    a single assignment, so sessions move to the new panel on their next rerun. While one
+    thread rebuilds, other sessions keep getting the previous panel instead of waiting.
+    """
+    source = resolve_source(source)
+    data = load_working_data(source)
+    directory = delta_dir(source)
+    deltas = list_deltas(directory)
+
+    with _cache_lock:
+        cached = _panels.get(source)
+    if cached is not None and cached[0] is data and cached[1] == deltas:
+        return cached[2]
+    if not _refresh_lock.acquire(blocking=cached is None):
+        return cached[2]
+
+    try:
+        with _cache_lock:
+            cached = _panels.get(source)
+        if cached is not None and cached[0] is data and cached[1] == deltas:
+            return cached[2]
+
+        if cached is not None and cached[0] is data and cached[1] == deltas[:len(cached[1])]:
+            merged, pending, trends = cached[2].source_data, deltas[len(cached[1]):], cached[2].trends
+        else:
+            merged, pending, trends = data, deltas, None
+        if pending:
+            # A panel store carries the derived metrics; merge over the inputs only so they are recomputed.
+            merged = drop_derived(merged)
+        for name, _ in pending:
+            delta = read_delta(os.path.join(directory, name))
+            # Deltas that only add new (country, year) rows extend the fitted trends; revisions refit.
+            if trends is not None and set(delta.columns) <= set(merged.columns) and not revised_rows(merged, delta).any():
+                trends = trends.extend(add_derived(delta.drop_duplicates(DELTA_KEY, keep='last')))
+            else:
+                trends = None
+            merged = apply_delta(merged, delta)
+
+        panel = Panel(merged, version=cached[2].version + 1 if cached is not None else 0, trends=trends)
+        with _cache_lock:
+            _panels[source] = (data, deltas, panel)
+        if cached is not None:
+            _retire(cached[2])
+        return panel
+    finally:
+        _refresh_lock.release()
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+        _panels.clear()
@@ -0,0 +1,72 @@
+"""Derived metrics, computed once over the whole panel when it is loaded.
+
+Each metric is declared with `@derived(name, inputs)` as a function of the frame that returns
+a column. Metrics are added in declaration order, so a formula can use the metrics declared
+before it. A metric whose inputs are missing from the data is skipped. Derived columns are
+ordinary numeric columns of `Panel.data`, so Sandbox Mode and the rollup pick them up too.
+"""
+
+REGISTRY = []
+
+
+def derived(name, inputs):
+    def register(formula):
+        REGISTRY.append((name, tuple(inputs), formula))
+        return formula
+    return register
+
+
+def add_derived(data):
+    """Return `data` with every registered metric whose inputs are present added as a column.
+
+    Metrics the frame already has (e.g. from a panel store) are kept as they are.
+    """
+    for name, inputs, formula in REGISTRY:
+        if name not in data.columns and all(column in data.columns for column in inputs):
+            data = data.assign(**{name: formula(data)})
+    return data
+
+
+def lineage(name):
+    """Every metric `name` is computed from, directly or through other derived metrics."""
+    inputs = {metric: metric_inputs for metric, metric_inputs, _ in REGISTRY}
+    found, pending = set(), list(inputs.get(name, ()))
+    while pending:
+        metric = pending.pop()
+        if metric not in found:
+            found.add(metric)
+            pending.extend(inputs.get(metric, ()))
+    return found
+
+
+def drop_derived(data):
+    """Return `data` without the registered metrics, so `add_derived` recomputes them from the inputs."""
+    return data.drop(columns=[name for name, _, _ in REGISTRY if name in data.columns])
+
+
+@derived('renewable_energy_twh', ['energy_consumption_twh', 'renewable_energy_share'])
+def renewable_energy(data):
+    return data['energy_consumption_twh'] * (data['renewable_energy_share'] / 100)
+
+
+@derived('non_renewable_energy_twh', ['energy_consumption_twh', 'renewable_energy_share'])
+def non_renewable_energy(data):
+    return data['energy_consumption_twh'] * (1 - data['renewable_energy_share'] / 100)
+
+
+@derived('education_expenditure_per_capita_usd', ['gdp_per_capita_usd', 'education_expenditure_gdp'])
+def education_expenditure_per_capita(data):
+    return data['gdp_per_capita_usd'] * (data['education_expenditure_gdp'] / 100)
+
+
+@derived('military_expenditure_per_capita_usd', ['military_expenditure_billion_usd', 'population_millions'])
+def military_expenditure_per_capita(data):
+    return data['military_expenditure_billion_usd'] * 1000 / data['population_millions']
+
+
+@derived('remaining_gdp_per_capita_usd', ['gdp_per_capita_usd', 'education_expenditure_per_capita_usd',
+                                          'healthcare_expenditure_per_capita_usd', 'military_expenditure_per_capita_usd'])
+def remaining_gdp_per_capita(data):
+    return data['gdp_per_capita_usd'] - (data['education_expenditure_per_capita_usd']
+                                         + data['healthcare_expenditure_per_capita_usd']
+                                         + data['military_expenditure_per_capita_usd'])
@@ -0,0 +1,83 @@
+"""Server-side point reduction for charts whose row count grows with the panel.
+
+Both reducers are deterministic, so a figure built from a sample is stable across reruns and
+safe to memoize.
+"""
+import numpy as np
+import pandas as pd
+
+import profiling
+
+
+@profiling.timed('downsample')
+def stratified(frame, max_points, by='country'):
+    """At most about `max_points` rows of `frame`, spread evenly within each `by` group.
+
+    Every group keeps a share of the budget proportional to its size, and at least one row,
+    so small countries stay visible next to large ones. Row order is preserved.
+    """
+    total = len(frame)
+    if total <= max_points:
+        return frame
+
+    codes, _ = pd.factorize(frame[by], sort=False)
+    counts = np.bincount(codes)
+    quotas = np.minimum(counts, np.maximum(1, counts * max_points // total))
+    order = np.argsort(codes, kind='stable')
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+
+    picks = [order[start + np.linspace(0, count - 1, quota).round().astype(int)]
+             for start, count, quota in zip(starts, counts, quotas)]
+    return frame.iloc[np.sort(np.concatenate(picks))]
+
+
+def lttb(x, y, max_points):
+    """Positions of the points Largest-Triangle-Three-Buckets keeps to draw (x, y) as a line.
+
+    The first and last points are always kept; each bucket in between keeps the point that
+    forms the largest triangle with the previously kept point and the next bucket's average,
+    which preserves peaks and troughs that a uniform sample would skip.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    length = len(x)
+    if max_points >= length or max_points < 3:
+        return np.arange(length)
+
+    every = (length - 2) / (max_points - 2)
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0] = anchor = 0
+    for bucket in range(max_points - 2):
+        start = int(bucket * every) + 1
+        stop = int((bucket + 1) * every) + 1
+        next_stop = min(int((bucket + 2) * every) + 1, length)
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+
+        area = np.abs((x[anchor] - avg_x) * (y[start:stop] - y[anchor])
+                      - (x[anchor] - x[start:stop]) * (avg_y - y[anchor]))
+        anchor = start + int(area.argmax())
+        kept[bucket + 1] = anchor
+    kept[-1] = length - 1
+    return kept
+
+
+@profiling.timed('downsample')
+def lttb_by_group(frame, x, y, max_points, by='country'):
+    """Apply `lttb` to each `by` group's line, splitting the budget by group size.
+
+    Rows with a missing `y` are dropped from groups that need thinning, since they cannot be
+    ranked; groups already under their share are returned untouched.
+    """
+    total = len(frame)
+    if total <= max_points:
+        return frame
+
+    parts = []
+    for _, group in frame.groupby(by, observed=True, sort=False):
+        budget = max(3, len(group) * max_points // total)
+        if len(group) > budget:
+            group = group[group[y].notna()]
+            group = group.iloc[lttb(group[x], group[y], budget)]
+        parts.append(group)
+    return pd.concat(parts)
@@ -0,0 +1,284 @@
+"""Rebuild working_df.csv from the Kaggle panel and the UN SYB66 tables.
+
+Usage: `python etl.py [output_path] [--all-areas]`
+
+The raw files are read in chunks, so only the pivoted (country, year) values are ever held
+in memory. Parsed inputs and joined per-country partitions are cached under `.etl_cache/`,
+and a re-run only re-parses inputs whose content changed and only re-joins the countries
+whose rows in those inputs changed.
+"""
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+KAGGLE_PATH = os.path.join(BASE_DIR, 'country_comparison_large_dataset.csv')
+TRADE_PATH = os.path.join(BASE_DIR, 'Data', 'SYB66_123_202310_Total Imports Exports and Balance of Trade.csv')
+GVA_PATH = os.path.join(BASE_DIR, 'Data', 'SYB66_153_202310_Gross Value Added by Economic Activity.csv')
+OUTPUT_PATH = os.path.join(BASE_DIR, 'working_df.csv')
+CACHE_DIR = os.path.join(BASE_DIR, '.etl_cache')
+
+CHUNK_SIZE = 50_000
+
+KAGGLE_COLUMNS = {
+    'Country': 'country',
+    'Year': 'year',
+    'GDP (in Trillions USD)': 'gdp_trillions_usd',
+    'GDP per Capita (in USD)': 'gdp_per_capita_usd',
+    'Inflation Rate (%)': 'inflation_rate',
+    'Population (in Millions)': 'population_millions',
+    'Population Growth Rate (%)': 'population_growth_rate',
+    'Urban Population (%)': 'urban_population',
+    'Life Expectancy (Years)': 'life_expectancy_years',
+    'Healthcare Expenditure per Capita (USD)': 'healthcare_expenditure_per_capita_usd',
+    'Doctor-to-Patient Ratio': 'doctor_to_patient_ratio',
+    'Literacy Rate (%)': 'literacy_rate',
+    'Education Expenditure as % of GDP': 'education_expenditure_gdp',
+    'Internet Penetration (%)': 'internet_penetration',
+    'Smartphone Adoption (%)': 'smartphone_adoption',
+    'Energy Consumption (TWh)': 'energy_consumption_twh',
+    'Renewable Energy Share (%)': 'renewable_energy_share',
+    'Military Expenditure (in Billion USD)': 'military_expenditure_billion_usd',
+    'Number of Active Military Personnel': 'active_military_personnel',
+    'CO2 Emissions (Million Metric Tons)': 'co2_emissions_million_metric_tons',
+    'Forest Coverage (%)': 'forest_coverage',
+    'Number of Airports': 'number_of_airports',
+    'Road Network Length (in km)': 'road_network_length_km',
+    'Public Transport Usage (%)': 'public_transport_usage',
+    'Human Development Index (HDI)': 'hdi',
+    'Gender Equality Index': 'gender_equality_index',
+    'Poverty Rate (%)': 'poverty_rate',
+    'Number of International Visitors (in Millions)': 'international_visitors_millions',
+    'Tourism Revenue (in Billion USD)': 'tourism_revenue_billion_usd',
+    'Agricultural Land (%)': 'agricultural_land',
+    'Unemployment Rate (%)': 'unemployment_rate',
+    'Labor Force Participation Rate (%)': 'labor_force_participation_rate',
+    'Crime Rate (per 100,000)': 'crime_rate',
+    'Corruption Perception Index': 'corruption_perception_index',
+    'Freedom of Press Index': 'freedom_of_press_index',
+    'Voting Participation Rate (%)': 'voting_participation_rate',
+}
+
+# SYB series that end up as columns of the working dataset; every other series is skipped.
+SERIES_COLUMNS = {
+    'Exports FOB (millions of US dollars)': 'exports_millions_usd',
+    'Imports CIF (millions of US dollars)': 'imports_millions_usd',
+    'Agriculture, hunting, forestry and fishing (% of gross value added)': 'agriculture_hunting_forestry_fishing_pct_gross',
+    'Industry (% of gross value added)': 'industry_pct_gross',
+    'Services (% of gross value added)': 'services_pct_gross',
+}
+
+# Kaggle country names that differ from the UN area names.
+COUNTRY_ALIASES = {
+    'United States of America': 'USA',
+    'Russian Federation': 'Russia',
+}
+
+SYB_COLUMNS = list(SERIES_COLUMNS.values())
+
+
+def file_fingerprint(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def frame_digest(frame):
+    return hashlib.sha256(pd.util.hash_pandas_object(frame, index=True).values.tobytes()).hexdigest()
+
+
+def read_kaggle(path=KAGGLE_PATH, chunksize=CHUNK_SIZE):
+    """Read the Kaggle panel with working-dataset column names and literacy clamped to 100."""
+    chunks = []
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk = chunk.rename(columns=KAGGLE_COLUMNS)
+        chunk['literacy_rate'] = chunk['literacy_rate'].clip(upper=100)
+        chunks.append(chunk)
+    # Keep the file's row order: it decides the country order of the written dataset.
+    return pd.concat(chunks, ignore_index=True).set_index(['country', 'year'])
+
+
+def read_syb(path, chunksize=CHUNK_SIZE):
+    """Stream a SYB long-format table and pivot the wanted series into (country, year) columns.
+
+    SYB files have a title row above the real header, an unnamed area-name column and
+    thousands separators in the values. Each chunk is filtered and pivoted on its own, so
+    memory is bounded by the pivoted output rather than the raw file.
+    """
+    pieces = []
+    reader = pd.read_csv(path, header=1, thousands=',', encoding='latin-1', chunksize=chunksize)
+    for chunk in reader:
+        chunk = chunk.rename(columns={chunk.columns[1]: 'country', 'Year': 'year'})
+        chunk = chunk[chunk['Series'].isin(SERIES_COLUMNS.keys())]
+        if chunk.empty:
+            continue
+        chunk = chunk.assign(
+            country=chunk['country'].replace(COUNTRY_ALIASES),
+            column=chunk['Series'].map(SERIES_COLUMNS),
+            Value=pd.to_numeric(chunk['Value'], errors='coerce'),
+        )
+        pieces.append(chunk.pivot_table(index=['country', 'year'], columns='column', values='Value', aggfunc='last'))
+
+    if not pieces:
+        return pd.DataFrame(columns=[]).rename_axis(['country', 'year'])
+    # An area's rows can straddle a chunk boundary, so merge the per-chunk pivots.
+    wide = pd.concat(pieces).groupby(level=['country', 'year']).last()
+    wide.columns.name = None
+    return wide.sort_index()
+
+
+def impute(partition):
+    """Fill the SYB gaps for one country: linear in time between observed years, nearest value at the ends.
+
+    SYB only publishes every few years (1995, 2005, 2010, ...), so the partition passed in
+    should include the SYB-only years as well; they anchor the interpolation.
+    """
+    partition = partition.sort_values('year')
+    years = partition['year'].to_numpy(dtype=float)
+    for col in SYB_COLUMNS:
+        values = partition[col].to_numpy(dtype=float)
+        observed = ~np.isnan(values)
+        if observed.any():
+            partition[col] = np.interp(years, years[observed], values[observed])
+    return partition
+
+
+def build_partition(country, kaggle_rows, syb_rows, include_all_areas):
+    if kaggle_rows.empty and not include_all_areas:
+        return None
+    joined = kaggle_rows.join(syb_rows, how='outer')
+    joined = joined.reindex(columns=[c for c in KAGGLE_COLUMNS.values() if c not in ('country', 'year')] + SYB_COLUMNS)
+    joined = impute(joined.rename_axis('year').reset_index())
+    if not kaggle_rows.empty:
+        joined = joined[joined['year'].isin(kaggle_rows.index)]
+    joined = joined.reset_index(drop=True)
+    joined['country'] = country
+    return joined
+
+
+class Pipeline:
+    """Incremental build of the working dataset.
+
+    Stage 1 caches each parsed input keyed on its content hash. Stage 2 partitions the join by
+    country and caches each joined partition keyed on the digests of that country's rows in
+    every input, so only partitions touched by a changed input are recomputed.
+    """
+
+    def __init__(self, kaggle_path=KAGGLE_PATH, syb_paths=(TRADE_PATH, GVA_PATH), cache_dir=CACHE_DIR,
+                 chunksize=CHUNK_SIZE, include_all_areas=False):
+        self.kaggle_path = kaggle_path
+        self.syb_paths = list(syb_paths)
+        self.cache_dir = cache_dir
+        self.chunksize = chunksize
+        self.include_all_areas = include_all_areas
+        self.manifest_path = os.path.join(cache_dir, 'manifest.json')
+        self.recomputed = []
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get('include_all_areas') == self.include_all_areas:
+                return manifest
+        return {'include_all_areas': self.include_all_areas, 'inputs': {}, 'partitions': {}}
+
+    def _save_manifest(self, manifest):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _stage_path(self, name, key):
+        slug = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, name, f'{slug}.pkl')
+
+    def _parsed_input(self, manifest, path, parser):
+        fingerprint = file_fingerprint(path)
+        cache_path = self._stage_path('inputs', path)
+        if manifest['inputs'].get(path) == fingerprint and os.path.exists(cache_path):
+            return pd.read_pickle(cache_path)
+        parsed = parser(path, chunksize=self.chunksize)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        parsed.to_pickle(cache_path)
+        manifest['inputs'][path] = fingerprint
+        return parsed
+
+    def run(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        manifest = self._load_manifest()
+
+        kaggle = self._parsed_input(manifest, self.kaggle_path, read_kaggle)
+        syb_frames = [self._parsed_input(manifest, path, read_syb) for path in self.syb_paths]
+        syb = pd.DataFrame(columns=SYB_COLUMNS, index=pd.MultiIndex.from_tuples([], names=['country', 'year']))
+        for frame in syb_frames:
+            syb = frame.combine_first(syb)
+        syb = syb.reindex(columns=SYB_COLUMNS).astype(float)
+
+        kaggle_groups = dict(tuple(kaggle.groupby(level='country')))
+        syb_groups = dict(tuple(syb.groupby(level='country')))
+        countries = set(kaggle_groups) | (set(syb_groups) if self.include_all_areas else set())
+
+        empty_kaggle = kaggle.iloc[0:0]
+        empty_syb = syb.iloc[0:0]
+        partitions = []
+        digests = {}
+        self.recomputed = []
+        for country in sorted(countries):
+            kaggle_rows = kaggle_groups.get(country, empty_kaggle)
+            syb_rows = syb_groups.get(country, empty_syb)
+            digest = frame_digest(kaggle_rows) + frame_digest(syb_rows)
+            cache_path = self._stage_path('partitions', country)
+
+            if manifest['partitions'].get(country) == digest and os.path.exists(cache_path):
+                partition = pd.read_pickle(cache_path)
+            else:
+                partition = build_partition(country, kaggle_rows.droplevel('country'),
+                                            syb_rows.droplevel('country'), self.include_all_areas)
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                pd.to_pickle(partition, cache_path)
+                self.recomputed.append(country)
+            digests[country] = digest
+            if partition is not None:
+                partitions.append(partition)
+
+        manifest['partitions'] = digests
+        self._save_manifest(manifest)
+
+        working = pd.concat(partitions, ignore_index=True)
+        # A one-hot column per UN area would only bloat the file, so the block is kept for the Kaggle panel only.
+        return finalize(working, kaggle.index.get_level_values('country').unique(), one_hot=not self.include_all_areas)
+
+
+def finalize(working, panel_countries, one_hot=True):
+    """Lay the joined panel out the way working_df.csv has it: year-major rows, one-hot country block last."""
+    order = {country: i for i, country in enumerate(panel_countries)}
+    working = working.assign(_order=working['country'].map(order).fillna(len(order)))
+    working = working.sort_values(['year', '_order', 'country'], kind='stable').drop(columns='_order')
+    working['year'] = working['year'].astype(float)
+
+    columns = ['year'] + [c for c in working.columns if c not in ('year', 'country')]
+    blocks = [working[columns]]
+    if one_hot:
+        blocks.append(pd.get_dummies(working['country'], prefix='country', dtype=float))
+    blocks.append(working[['country']])
+    return pd.concat(blocks, axis=1).reset_index(drop=True)
+
+
+def write_working_data(working, output_path=OUTPUT_PATH):
+    tmp_path = output_path + '.tmp'
+    working.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, output_path)
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    pipeline = Pipeline(include_all_areas='--all-areas' in sys.argv)
+    output_path = args[0] if args else OUTPUT_PATH
+    write_working_data(pipeline.run(), output_path)
+    print(f"Wrote {output_path} ({len(pipeline.recomputed)} partitions recomputed)")
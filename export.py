@@ -0,0 +1,139 @@
+"""Pre-render the read-only dashboard pages to static files.
+
+Usage: `python export.py [output_dir] [--workers N] [--png]`
+
+Every (country, year) Country View page and the default Stats View are written as a
+standalone HTML page plus a JSON file holding the KPI values, tables and the Plotly figure specs,
+rendered in parallel across a process pool. `--png` also writes each chart as a PNG, which
+needs the kaleido package. The output directory gets an index page and a local copy of
+plotly.js, so it can be served as-is from any static file server.
+"""
+import argparse
+import html
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+import correlations
+import data_loader
+import figures
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static_export')
+PLOTLY_JS = 'plotly.min.js'
+
+KPI_STYLE = ("background-color: blue; color: white; padding: 20px; border-radius: 5px; "
+             "text-align: center; flex: 1")
+
+_panel = None
+
+
+def slug(name):
+    return re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-')
+
+
+def page(title, body, depth):
+    script = '../' * depth + PLOTLY_JS
+    return (f"<!DOCTYPE html>\n<html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+            f"<script src='{script}'></script></head>\n"
+            f"<body style='font-family: sans-serif'>\n<h1>{html.escape(title)}</h1>\n{body}\n</body></html>\n")
+
+
+def charts_html(charts):
+    return '\n'.join(pio.to_html(fig, full_html=False, include_plotlyjs=False) for fig in charts.values())
+
+
+def write_page(path, title, kpis, charts, png, depth, tables=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tables = tables or {}
+    tiles = ''.join(f"<div style='{KPI_STYLE}'>{html.escape(label)}: {value}</div>" for label, value in kpis.items())
+    body = (f"<div style='display: flex; gap: 10px'>{tiles}</div>\n" if kpis else '') + charts_html(charts)
+    body += ''.join(f"\n<h2>{html.escape(name)}</h2>\n{table.to_html(index=False, na_rep='')}"
+                    for name, table in tables.items())
+    with open(path + '.html', 'w', encoding='utf-8') as f:
+        f.write(page(title, body, depth))
+    with open(path + '.json', 'w', encoding='utf-8') as f:
+        json.dump({'title': title, 'kpis': kpis,
+                   'tables': {name: json.loads(table.to_json(orient='records')) for name, table in tables.items()},
+                   'figures': {name: json.loads(pio.to_json(fig)) for name, fig in charts.items()}}, f)
+    if png:
+        for name, fig in charts.items():
+            fig.write_image(f'{path}.{name}.png')
+
+
+def _init_worker(source):
+    global _panel
+    _panel = data_loader.load_panel(source)
+
+
+def export_country(country, output_dir, png):
+    """Write every year's Country View page for one country; returns the years written."""
+    country_charts = {build.__name__: build(_panel, country) for build in figures.COUNTRY_CHARTS}
+    years = []
+    for year in _panel.years:
+        row = _panel.row(country, year)
+        if row is None:
+            continue
+        # File name, title and index link all use the same integer year.
+        year = int(year)
+        # Missing values become null rather than NaN, which is not valid JSON.
+        kpis = {label: None if math.isnan(row[column]) else float(row[column])
+                for label, column in figures.COUNTRY_KPIS.items()}
+        charts = {build.__name__: build(_panel, country, year) for build in figures.COUNTRY_YEAR_CHARTS}
+        charts.update(country_charts)
+        write_page(os.path.join(output_dir, 'country', slug(country), str(year)),
+                   f"{country}, {year}", kpis, charts, png, depth=2)
+        years.append(year)
+    return years
+
+
+def export_stats(output_dir, png):
+    countries, years = tuple(_panel.countries), (int(_panel.years[0]), int(_panel.years[-1]))
+    # Same order as the live view: the correlation heatmap and ranking first, then the fixed scatters.
+    charts = {'correlation_heatmap': figures.correlation_heatmap(_panel, countries, years, 'pearson')}
+    charts.update({label: figures.stats_scatter(_panel, countries, years, x, y, title, **options)
+                   for label, (x, y, title, options) in figures.STATS_SCATTERS.items()})
+    charts['voting_bar'] = figures.voting_bar(_panel, years)
+    tables = {"Strongest relationships": correlations.strongest(_panel, countries, years).drop(columns='country')}
+    write_page(os.path.join(output_dir, 'stats'), "Stats View, all countries", {}, charts, png, depth=0, tables=tables)
+
+
+def write_index(output_dir, exported):
+    items = ["<li><a href='stats.html'>Stats View, all countries</a></li>"]
+    for country, years in exported.items():
+        links = ' '.join(f"<a href='country/{slug(country)}/{year}.html'>{year}</a>" for year in years)
+        items.append(f"<li>{html.escape(country)}: {links}</li>")
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(page("Socio-Economic Trend Analysis in Developing Countries", f"<ul>\n{chr(10).join(items)}\n</ul>", 0))
+
+
+def export(output_dir=OUTPUT_DIR, workers=None, png=False, source=None):
+    source = data_loader.resolve_source(source)
+    _init_worker(source)
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, PLOTLY_JS), 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source,)) as pool:
+        stats = pool.submit(export_stats, output_dir, png)
+        pending = {country: pool.submit(export_country, country, output_dir, png) for country in _panel.countries}
+        exported = {country: future.result() for country, future in pending.items()}
+        stats.result()
+
+    write_index(output_dir, exported)
+    return sum(len(years) for years in exported.values())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output_dir', nargs='?', default=OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--png', action='store_true')
+    args = parser.parse_args(sys.argv[1:])
+    pages = export(args.output_dir, workers=args.workers, png=args.png)
+    print(f"Wrote {pages} Country View pages and the Stats View to {args.output_dir}")
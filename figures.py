@@ -0,0 +1,437 @@
+"""Figure builders for every dashboard chart.
+
+Each builder is a pure function of the panel and the widget values that affect that one chart,
+memoized in a bounded LRU that all sessions in the process share, with entries expiring after
+`FIGURE_CACHE_TTL` seconds. A rerun that only changes one widget rebuilds only the charts that
+depend on it. The panel is part of the key (by identity), so reloading the data naturally
+misses the cache, and the entries of a panel that has been replaced are dropped so they do
+not keep it alive.
+
+Builders take tuples rather than lists so their arguments are hashable, and the figures they
+return are shared: callers must not modify them.
+
+Sandbox charts cap how many points they send to the browser: above `MAX_POINTS` rows the
+data is thinned server-side and the figure says how many points it shows, and 2D scatter and
+line traces switch to WebGL above `WEBGL_THRESHOLD` points. They can also hide or mark the
+points the panel's precomputed quality flags single out (see `QUALITY_MODES`).
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import plotly.express as px
+
+import correlations
+import data_loader
+import downsample
+import quality as data_quality
+
+FIGURE_CACHE_SIZE = 512
+FIGURE_CACHE_TTL = 3600
+
+# Points per Sandbox chart before server-side downsampling kicks in.
+MAX_POINTS = 10000
+MAX_POINTS_3D = 5000
+
+# Scatter and line traces above this many points are drawn with WebGL instead of SVG.
+WEBGL_THRESHOLD = 1000
+
+# How Sandbox charts treat points with a data-quality flag on any plotted metric. Parallel
+# coordinates cannot mark single lines, so they only hide.
+QUALITY_MODES = {
+    'show': "Show all points",
+    'mark': "Mark flagged points",
+    'hide': "Hide flagged points",
+}
+
+CENTERED_LEGEND = dict(x=0.5, y=1.1, orientation='h', xanchor='center')
+
+_builders = []
+
+
+def figure_cache(func):
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def builder(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with lock:
+            cached = cache.get(key)
+            if cached is not None and now - cached[0] < FIGURE_CACHE_TTL:
+                cache.move_to_end(key)
+                return cached[1]
+
+        fig = func(*args, **kwargs)
+        if any(getattr(arg, 'retired', False) for arg in args):
+            # Built for a panel replaced while this ran (e.g. on the background pool): don't keep it.
+            return fig
+        with lock:
+            cache[key] = (now, fig)
+            cache.move_to_end(key)
+            while len(cache) > FIGURE_CACHE_SIZE:
+                cache.popitem(last=False)
+        return fig
+
+    def cache_clear():
+        with lock:
+            cache.clear()
+
+    def forget(panel):
+        with lock:
+            for key in [key for key in cache if any(arg is panel for arg in key[0])]:
+                del cache[key]
+
+    builder.cache_clear = cache_clear
+    builder.forget = forget
+    _builders.append(builder)
+    return builder
+
+
+def _render_mode(frame):
+    return 'webgl' if len(frame) > WEBGL_THRESHOLD else 'svg'
+
+
+def _note_sampling(fig, shown, total):
+    if shown < total:
+        fig.add_annotation(text=f"Showing {shown:,} of {total:,} points", xref='paper', yref='paper',
+                           x=1, y=1.02, xanchor='right', yanchor='bottom', showarrow=False)
+    return fig
+
+
+def _screen(panel, frame, metrics, quality):
+    if quality == 'hide':
+        return frame[~panel.quality.flagged(frame, metrics)]
+    return frame
+
+
+def _mark_flagged(fig, panel, frame, metrics, quality, x, y, z=None):
+    """Draw an X over each point of `frame` with a quality flag on one of `metrics`."""
+    if quality != 'mark':
+        return fig
+    bits = panel.quality.bits(frame, metrics)
+    flagged = frame[bits != 0]
+    if flagged.empty:
+        return fig
+    labels = [f"{country} {year}: {data_quality.describe(flags)}"
+              for country, year, flags in zip(flagged['country'], flagged['year'], bits[bits != 0])]
+    marker = dict(symbol='x', color='black', size=8 if z is None else 4)
+    if z is None:
+        fig.add_scatter(x=flagged[x], y=flagged[y], mode='markers', marker=marker, name="Flagged",
+                        hovertext=labels, hoverinfo='text')
+    else:
+        fig.add_scatter3d(x=flagged[x], y=flagged[y], z=flagged[z], mode='markers', marker=marker,
+                          name="Flagged", hovertext=labels, hoverinfo='text')
+    return fig
+
+
+def _overlay_trends(fig, panel, series, years):
+    """Add a dashed trend line and a shaded forecast band for each (trace, country, metric)."""
+    for trace, country, metric in series:
+        trend = panel.trends.line(country, metric, years)
+        if trend.empty:
+            continue
+        color = trace.line.color
+        fig.add_scatter(x=trend['year'], y=trend['trend'], mode='lines', name=f"{trace.name} trend",
+                        line=dict(color=color, dash='dash'), legendgroup=trace.name, showlegend=False)
+        forecast = trend.dropna(subset=['lower'])
+        if forecast.empty:
+            continue
+        fig.add_scatter(x=np.r_[forecast['year'], forecast['year'][::-1]],
+                        y=np.r_[forecast['upper'], forecast['lower'][::-1]],
+                        fill='toself', fillcolor=color, opacity=0.15, line=dict(width=0), hoverinfo='skip',
+                        name=f"{trace.name} forecast", legendgroup=trace.name, showlegend=False)
+    return fig
+
+
+def _country_years(panel, country):
+    years = panel.country(country)['year']
+    return int(years.iloc[0]), int(years.iloc[-1])
+
+
+def _donut(values, names, title):
+    fig = px.pie(values=values, names=names, title=title, hole=0.3)  # Make it a donut chart
+    fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=12, showlegend=False)
+    return fig
+
+
+# Country View
+
+@figure_cache
+def energy_pie(panel, country, year):
+    row = panel.row(country, year)
+    return _donut([row['non_renewable_energy_twh'], row['renewable_energy_twh']],
+                  ['Non-Renewable', 'Renewable'],
+                  "Energy Consumption")
+
+
+@figure_cache
+def expenditure_pie(panel, country, year):
+    row = panel.row(country, year)
+    return _donut([row['remaining_gdp_per_capita_usd'], row['education_expenditure_per_capita_usd'],
+                   row['healthcare_expenditure_per_capita_usd'], row['military_expenditure_per_capita_usd']],
+                  ['Remaining GDP per Capita', 'Education Expenditure', 'Healthcare Expenditure', 'Military Expenditure'],
+                  "Education and Healthcare Expenditure")
+
+
+@figure_cache
+def sectors_pie(panel, country, year):
+    row = panel.row(country, year)
+    return _donut([row['agriculture_hunting_forestry_fishing_pct_gross'], row['industry_pct_gross'], row['services_pct_gross']],
+                  ['Agriculture', 'Industry', 'Services'],
+                  "Gross Contribution by Each Sector")
+
+
+@figure_cache
+def adoption_bar(panel, country):
+    adoption_data = panel.country(country).groupby('year', observed=True)[['internet_penetration', 'smartphone_adoption']].sum().reset_index()
+
+    bar_fig = px.bar(adoption_data, x='year', y=['internet_penetration', 'smartphone_adoption'],
+                     title="Internet Penetration and Smartphone Adoption Over Years",
+                     barmode='group')
+
+    bar_fig.for_each_trace(lambda t: t.update(yaxis='y2') if t.name == 'smartphone_adoption' else ())
+
+    bar_fig.update_layout(
+        title="Internet Penetration and Smartphone Adoption Over Time",
+        xaxis_title="Year",
+        barmode='group',
+        height=500,
+        legend_title="",
+        template='plotly_white',
+        yaxis=dict(
+            title='',
+            range=[0, 100]
+        ),
+        yaxis2=dict(
+            title='',
+            overlaying='y',
+            side='left',
+            range=[0, 100]
+        ),
+        legend=CENTERED_LEGEND
+    )
+    return bar_fig
+
+
+@figure_cache
+def imports_exports_bar(panel, country):
+    imp_exp_data = panel.country(country).groupby('year', observed=True)[['imports_millions_usd', 'exports_millions_usd']].sum().reset_index()
+    imports_exports_fig = px.bar(
+        imp_exp_data,
+        x='year',
+        y=['imports_millions_usd', 'exports_millions_usd'],
+        title="Imports vs Exports Over Time",
+        labels={'value': 'Value (in Millions USD)', 'year': 'Year'},
+        barmode='group',
+    )
+
+    imports_exports_fig.update_layout(
+        xaxis_title="Year",
+        yaxis_title="Value (in Millions USD)",
+        legend_title="",
+        width=1000,
+        height=500,
+        template='plotly_white',
+        legend=CENTERED_LEGEND
+    )
+    return imports_exports_fig
+
+
+@figure_cache
+def hdi_line(panel, country):
+    hdi_fig = px.line(panel.country(country),
+                      x='year',
+                      y=['hdi', 'gender_equality_index'],
+                      title="HDI and Gender Equality Index Over Years",
+                      color_discrete_sequence=['blue', 'orange'])
+
+    hdi_fig.update_layout(xaxis_title="Year", yaxis_title="", legend_title="", legend=CENTERED_LEGEND)
+    return _overlay_trends(hdi_fig, panel, [(trace, country, trace.name) for trace in hdi_fig.data],
+                           _country_years(panel, country))
+
+
+@figure_cache
+def indices_line(panel, country):
+    indices_fig = px.line(panel.country(country),
+                          x='year',
+                          y=['corruption_perception_index', 'freedom_of_press_index'],
+                          title="Corruption Perception Index and Freedom of Press Index Over Years",
+                          labels={'value': 'Index Value'},
+                          color_discrete_sequence=['green', 'red'])
+    indices_fig.update_layout(xaxis_title="Year", yaxis_title="", legend_title="", legend=CENTERED_LEGEND)
+    return _overlay_trends(indices_fig, panel, [(trace, country, trace.name) for trace in indices_fig.data],
+                           _country_years(panel, country))
+
+
+# Key metrics shown above the Country View charts, as label -> column.
+COUNTRY_KPIS = {
+    "GDP per Capita (USD)": 'gdp_per_capita_usd',
+    "Population (Millions)": 'population_millions',
+    "Life Expectancy (Years)": 'life_expectancy_years',
+    "CO2 Emissions (Metric Tons)": 'co2_emissions_million_metric_tons',
+}
+
+# Country View charts in page order, split by whether they also depend on the year.
+COUNTRY_YEAR_CHARTS = (energy_pie, expenditure_pie, sectors_pie)
+COUNTRY_CHARTS = (adoption_bar, imports_exports_bar, hdi_line, indices_line)
+
+
+# Stats View
+
+# label -> (x, y, title, extra stats_scatter arguments), in page order.
+STATS_SCATTERS = {
+    'pop_unemp': ('population_growth_rate', 'unemployment_rate',
+                  "Population Growth Rate vs Unemployment Rate", dict(size=(600, 400))),
+    'pov_unemp': ('poverty_rate', 'unemployment_rate',
+                  "Poverty Rate vs Unemployment Rate", dict(size=(600, 400))),
+    'co2_forest': ('co2_emissions_million_metric_tons', 'forest_coverage',
+                   "CO2 Emissions vs Forest Coverage", {}),
+    'co2_energy': ('co2_emissions_million_metric_tons', 'energy_consumption_twh',
+                   "CO2 Emissions vs Energy Consumption", {}),
+    # Log scale for Military Expenditure
+    'pov_military': ('poverty_rate', 'military_expenditure_billion_usd',
+                     "Poverty Rate vs Military Expenditure", dict(log_y=True)),
+    'pov_inf': ('poverty_rate', 'inflation_rate',
+                "Poverty Rate vs Inflation Rate", {}),
+    'corruption': ('corruption_perception_index', 'freedom_of_press_index',
+                   "Corruption Perception Index vs Freedom of Press Index", {}),
+}
+
+
+@figure_cache
+def stats_scatter(panel, countries, years, x, y, title, log_y=False, size=None):
+    fig = px.scatter(panel.select(countries, years), x=x, y=y, color='country', title=title)
+    if log_y:
+        fig.update_yaxes(type='log')
+    if size:
+        fig.update_layout(width=size[0], height=size[1])
+    return fig
+
+
+@figure_cache
+def voting_bar(panel, years):
+    avg_voting_data = panel.rollup.mean('voting_participation_rate', years).reset_index()
+
+    avg_voting_data = avg_voting_data.sort_values(by='voting_participation_rate', ascending=False)
+
+    return px.bar(avg_voting_data, x='country', y='voting_participation_rate',
+                  title="Average Voting Participation Rate by Country",
+                  color='voting_participation_rate',
+                  color_continuous_scale='Blues')
+
+
+@figure_cache
+def correlation_heatmap(panel, countries, years, method):
+    matrix = correlations.correlation_matrix(panel, countries, years, method)
+    fig = px.imshow(matrix, zmin=-1, zmax=1, color_continuous_scale='RdBu_r', aspect='auto',
+                    title=f"{method.title()} Correlation Between Metrics")
+    fig.update_layout(height=800)
+    return fig
+
+
+# Sandbox Mode
+
+@figure_cache
+def metric_line(panel, countries, years, metric, log_scale, trend=False, quality='show'):
+    filtered_data = _screen(panel, panel.select(countries, years), [metric], quality)
+    sampled = downsample.lttb_by_group(filtered_data, 'year', metric, MAX_POINTS)
+    fig_line = px.line(
+        sampled,
+        x='year',
+        y=metric,
+        color='country',
+        log_y=log_scale,
+        render_mode=_render_mode(sampled),
+        title=f"{metric} over the Years"
+    )
+    if trend:
+        _overlay_trends(fig_line, panel, [(trace, trace.name, metric) for trace in fig_line.data], years)
+    _mark_flagged(fig_line, panel, sampled, [metric], quality, 'year', metric)
+    return _note_sampling(fig_line, len(sampled), len(filtered_data))
+
+
+@figure_cache
+def metric_average_pie(panel, countries, years, metric, quality='show'):
+    if quality == 'hide':
+        # The rollup covers every value, so average the remaining points directly instead.
+        shown = _screen(panel, panel.select(countries, years), [metric], quality)
+        avg_metric = shown.groupby('country', sort=False, observed=True)[metric].mean().reset_index()
+    else:
+        avg_metric = panel.rollup.mean(metric, years, countries).reset_index()
+    return px.pie(
+        avg_metric,
+        values=metric,
+        names='country',
+        title=f"Average {metric} by Country"
+    )
+
+
+@figure_cache
+def metric_scatter(panel, countries, years, x_metric, y_metric, log_scale, quality='show'):
+    filtered_data = _screen(panel, panel.select(countries, years), [x_metric, y_metric], quality)
+    sampled = downsample.stratified(filtered_data, MAX_POINTS)
+    fig_scatter = px.scatter(sampled, x=x_metric, y=y_metric, color='country', log_y=log_scale,
+                             render_mode=_render_mode(sampled), title=f"{x_metric} vs {y_metric}")
+    fig_scatter.update_layout(height=600, width=900)
+    _mark_flagged(fig_scatter, panel, sampled, [x_metric, y_metric], quality, x_metric, y_metric)
+    return _note_sampling(fig_scatter, len(sampled), len(filtered_data))
+
+
+@figure_cache
+def metric_scatter_3d(panel, countries, years, x_metric, y_metric, z_metric, quality='show'):
+    filtered_data = _screen(panel, panel.select(countries, years), [x_metric, y_metric, z_metric], quality)
+    sampled = downsample.stratified(filtered_data, MAX_POINTS_3D)
+    fig_3d = px.scatter_3d(sampled, x=x_metric, y=y_metric, z=z_metric, color='country',
+                           title=f"3D Plot: {x_metric} vs {y_metric} vs {z_metric}")
+    fig_3d.update_layout(height=800, width=900)
+    _mark_flagged(fig_3d, panel, sampled, [x_metric, y_metric, z_metric], quality, x_metric, y_metric, z_metric)
+    return _note_sampling(fig_3d, len(sampled), len(filtered_data))
+
+
+@figure_cache
+def parallel_coordinates(panel, countries, years, metrics, quality='show'):
+    metrics = list(metrics)
+    complete_rows = _screen(panel, panel.select(countries, years), metrics, quality)[['country', 'year'] + metrics].dropna()
+    filtered_data = downsample.stratified(complete_rows, MAX_POINTS_3D)
+    country_map = {country: idx for idx, country in enumerate(filtered_data['country'].unique().tolist())}
+    filtered_data = filtered_data.assign(country_numeric=filtered_data['country'].map(country_map).astype(int))
+
+    fig_parallel = px.parallel_coordinates(
+        filtered_data,
+        dimensions=metrics + ['country_numeric'],
+        color='country_numeric',
+        color_continuous_scale=px.colors.sequential.Viridis,
+        title="",
+        labels={'country_numeric': 'Country'}
+    )
+
+    fig_parallel.update_layout(
+        margin=dict(l=100, r=50, t=50, b=50),
+        coloraxis_showscale=False
+    )
+
+    country_ticks = list(country_map.items())
+    fig_parallel.data[0].dimensions[-1].update(
+        ticktext=[c[0] for c in country_ticks],
+        tickvals=[c[1] for c in country_ticks]
+    )
+    return _note_sampling(fig_parallel, len(filtered_data), len(complete_rows))
+
+
+def clear_cache():
+    for builder in _builders:
+        builder.cache_clear()
+    correlations.relationships.cache_clear()
+
+
+def forget(panel):
+    """Drop every cached figure built from `panel`."""
+    for builder in _builders:
+        builder.forget(panel)
+
+
+data_loader.on_retire(forget)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer_dtype, is_numeric_dtype
+
+import profiling
+from derived import add_derived
+from quality import Quality
+from rollup import Rollup
+from trends import Trends
+
+
+class Panel:
+    """Country-year panel indexed once at load time.
+
+    Rows are regrouped so each country's rows are contiguous and ordered by year, which makes
+    a country's history a slice and a (country, year) cell a dictionary lookup instead of a
+    boolean-mask scan over the whole frame. Countries keep the order they first appear in.
+    The derived metrics from `derived.py` are added as columns, and `metrics` lists every
+    numeric column but the year and the one-hot `country_*` flags; the engines below all work
+    on that list. `rollup` answers per-country
+    year-range aggregates of any numeric metric, `trends` holds the fitted trend of every
+    (country, metric) series, and `quality` holds the data-quality flags of every cell.
+    """
+
+    def __init__(self, data, version=0, trends=None):
+        if not is_integer_dtype(data['year']):
+            # The CSV stores years as 2000.0; keep them as integers so they match widget and URL values.
+            data = data.assign(year=data['year'].astype(np.int64))
+        self.source_data = data
+        self.version = version
+        # Set by data_loader once a newer panel replaces this one.
+        self.retired = False
+        codes, uniques = pd.factorize(data['country'], sort=False)
+        order = np.lexsort((data['year'].to_numpy(), codes))
+        if np.array_equal(order, np.arange(len(order))):
+            # Already in panel order (e.g. a mapped panel store): use the frame without copying it.
+            self.data = add_derived(data)
+        else:
+            self.data = add_derived(data.iloc[order].reset_index(drop=True))
+            codes = codes[order]
+
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+        ends = np.r_[starts[1:], len(codes)]
+
+        self.metrics = [col for col in self.data.columns
+                        if is_numeric_dtype(self.data[col]) and col != 'year' and not col.startswith('country_')]
+        self.countries = [uniques[codes[start]] for start in starts]
+        self.years = np.sort(self.data['year'].unique())
+        self._slices = {country: self.data.iloc[start:end] for country, start, end in zip(self.countries, starts, ends)}
+
+        self._rows = {}
+        for position, key in enumerate(zip(self.data['country'].tolist(), self.data['year'].tolist())):
+            # Keep the first row for a duplicated (country, year), as `.values[0]` used to.
+            self._rows.setdefault(key, position)
+
+        self.rollup = Rollup(self)
+        self.trends = trends if trends is not None else Trends(self.data, self.metrics)
+        self.quality = Quality(self.data, self.metrics)
+
+    def country(self, country):
+        """All rows for a country, ordered by year."""
+        if country in self._slices:
+            return self._slices[country]
+        return self.data.iloc[0:0]
+
+    def row(self, country, year):
+        """The row for (country, year) as a Series, or None if there is no such row."""
+        position = self._rows.get((country, year))
+        if position is None:
+            return None
+        return self.data.iloc[position]
+
+    @profiling.timed('filter')
+    def select(self, countries, years):
+        """Rows for the given countries within the inclusive (start, end) year range.
+
+        Rows come back grouped by country in panel order, whatever order `countries` is in,
+        so chart colours stay stable as the selection changes.
+        """
+        wanted = set(countries)
+        slices = [self._slices[country] for country in self.countries if country in wanted]
+        if not slices:
+            return self.data.iloc[0:0]
+        selected = pd.concat(slices) if len(slices) > 1 else slices[0]
+        return selected[selected['year'].between(years[0], years[1])]
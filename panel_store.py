@@ -0,0 +1,99 @@
+"""Compact, shared panel store: one float32 matrix in a memory-mapped file.
+
+Build it with `python panel_store.py [csv_path] [store_path]` (by default from working_df.csv).
+The file holds a JSON header followed by three aligned arrays: every metric as one
+column-major float32 matrix, the int32 country codes and the int16 years. Rows are stored in
+panel order (grouped by country, ordered by year) with the derived metrics already added, so
+Panel can use the mapped data as-is. Every worker that attaches the store reads the same
+page-cache pages through read-only, zero-copy NumPy views instead of holding its own copy.
+
+Metrics are stored as float32, so values keep about seven significant digits. The one-hot
+`country_*` block is not stored; it duplicates `country`.
+"""
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from panel import Panel
+
+MAGIC = b'SEPANEL1'
+ALIGNMENT = 64
+DEFAULT_CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'working_df.csv')
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'working_df.panel')
+
+
+def is_store(source):
+    return source.endswith('.panel')
+
+
+def store_path_for(csv_path):
+    return os.path.splitext(csv_path)[0] + '.panel'
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_store(panel, store_path=DEFAULT_STORE_PATH):
+    """Write a Panel's data, in panel order, to a store file."""
+    data, metrics = panel.data, panel.metrics
+    codes, countries = pd.factorize(data['country'], sort=False)
+    values = np.asfortranarray(data[metrics].to_numpy(dtype=np.float32))
+    arrays = {
+        'values': values,
+        'country_codes': codes.astype(np.int32),
+        'years': data['year'].to_numpy(dtype=np.int16),
+    }
+
+    header = {'rows': len(data), 'metrics': metrics, 'countries': [str(country) for country in countries]}
+    # The offsets depend on the header length, so lay the arrays out after a header with room to spare.
+    offset = _align(len(MAGIC) + 8 + len(json.dumps(header)) + 256)
+    header['offsets'] = {}
+    for name, array in arrays.items():
+        header['offsets'][name] = offset
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode()
+
+    tmp_path = store_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + len(header_bytes).to_bytes(8, 'little') + header_bytes)
+        for name, array in arrays.items():
+            f.seek(header['offsets'][name])
+            f.write(array.tobytes(order='F'))
+        f.truncate(offset)
+    os.replace(tmp_path, store_path)
+    return store_path
+
+
+def attach_store(store_path=DEFAULT_STORE_PATH):
+    """Map a store read-only and wrap it as a DataFrame without copying the metrics."""
+    with open(store_path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{store_path} is not a panel store")
+        header = json.loads(f.read(int.from_bytes(f.read(8), 'little')))
+
+    rows, metrics, offsets = header['rows'], header['metrics'], header['offsets']
+    values = np.memmap(store_path, dtype=np.float32, mode='r', offset=offsets['values'],
+                       shape=(rows, len(metrics)), order='F')
+    codes = np.memmap(store_path, dtype=np.int32, mode='r', offset=offsets['country_codes'], shape=(rows,))
+    years = np.memmap(store_path, dtype=np.int16, mode='r', offset=offsets['years'], shape=(rows,))
+
+    # A column-major matrix becomes a single pandas block as a view, so no metric is copied.
+    frame = pd.DataFrame(np.asarray(values), columns=metrics, copy=False)
+    frame.insert(0, 'year', np.asarray(years))
+    frame.insert(0, 'country', pd.Categorical.from_codes(np.asarray(codes), categories=header['countries']))
+    return frame
+
+
+def build_store(csv_path=DEFAULT_CSV_PATH, store_path=None):
+    store_path = store_path or store_path_for(csv_path)
+    return write_store(Panel(pd.read_csv(csv_path)), store_path)
+
+
+if __name__ == '__main__':
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV_PATH
+    store_path = sys.argv[2] if len(sys.argv) > 2 else None
+    print(f"Wrote {build_store(csv_path, store_path)}")
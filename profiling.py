@@ -0,0 +1,173 @@
+"""Opt-in timing of each stage of a dashboard rerun.
+
+Set SOCIOECON_PROFILE=1, or open the app with `?debug=1`, to time the data load, the filters
+and aggregations, and the build and emit of every chart. Each profiled rerun is logged as one
+JSON line on the `profiling` logger, added to process-wide totals, and shown in a debug panel
+in the sidebar, which can also capture a cProfile of the rerun. Set SOCIOECON_METRICS_PORT to
+serve the totals as Prometheus text on http://localhost:<port>/metrics.
+"""
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROFILE_ENV_VAR = 'SOCIOECON_PROFILE'
+METRICS_PORT_ENV_VAR = 'SOCIOECON_METRICS_PORT'
+
+# The metrics endpoint only listens on the loopback interface; scrape it from the same host.
+METRICS_HOST = '127.0.0.1'
+
+# Functions shown in the debug panel when a cProfile is captured.
+PROFILE_TOP_FUNCTIONS = 30
+
+# The rerun lines go to stderr whatever the root logger is set to, since profiling is opt-in anyway.
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.propagate = False
+
+# The profile of the rerun running on this thread; Streamlit runs each session's script on its own thread.
+_local = threading.local()
+_totals = {}
+_totals_lock = threading.Lock()
+_server = None
+_server_lock = threading.Lock()
+
+
+def is_enabled(debug_param=None):
+    return os.environ.get(PROFILE_ENV_VAR, '') not in ('', '0') or debug_param == '1'
+
+
+class RerunProfile:
+    """Stage timings of one rerun, in the order the stages finished.
+
+    Stages nest: a filter run while building a chart is recorded as "build <chart> / filter".
+    """
+
+    def __init__(self, capture=False):
+        self.stages = []
+        self.profile_text = None
+        self.finished = False
+        self._path = []
+        self._profile = cProfile.Profile() if capture else None
+        self._start = time.perf_counter()
+        if self._profile is not None:
+            self._profile.enable()
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def finish(self):
+        """Stop timing, add the stages to the totals and log them. Call it even when the run fails."""
+        if self.finished:
+            return
+        self.finished = True
+        if getattr(_local, 'current', None) is self:
+            _local.current = None
+        if self._profile is not None:
+            self._profile.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profile, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+            self.profile_text = out.getvalue()
+        self.stages.append(('rerun', time.perf_counter() - self._start))
+
+        with _totals_lock:
+            for name, seconds in self.stages:
+                count, total = _totals.get(name, (0, 0.0))
+                _totals[name] = (count + 1, total + seconds)
+        logger.info(json.dumps({'event': 'rerun', 'stages': {name: round(seconds, 6) for name, seconds in self.stages}}))
+
+
+class _Stage:
+    def __init__(self, rerun, name):
+        self.rerun = rerun
+        self.name = name
+
+    def __enter__(self):
+        self.rerun._path.append(self.name)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.rerun.stages.append((' / '.join(self.rerun._path), time.perf_counter() - self.start))
+        self.rerun._path.pop()
+
+
+def start_rerun(capture=False):
+    """Start profiling the rerun on this thread and return its RerunProfile."""
+    port = os.environ.get(METRICS_PORT_ENV_VAR)
+    if port:
+        serve_metrics(int(port))
+    _local.current = RerunProfile(capture)
+    return _local.current
+
+
+def stage(name):
+    """Time a block as a stage of the current rerun; does nothing when the rerun is not profiled."""
+    current = getattr(_local, 'current', None)
+    if current is None or current.finished:
+        return nullcontext()
+    return current.stage(name)
+
+
+def timed(name):
+    """Decorator form of `stage`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def metrics_text():
+    """Process-wide stage totals in the Prometheus text exposition format."""
+    with _totals_lock:
+        totals = sorted(_totals.items())
+    lines = ['# HELP socioecon_stage_seconds_total Time spent in each stage of profiled reruns.',
+             '# TYPE socioecon_stage_seconds_total counter']
+    lines += [f'socioecon_stage_seconds_total{{stage="{_escape(name)}"}} {seconds:.6f}' for name, (_, seconds) in totals]
+    lines += ['# HELP socioecon_stage_calls_total Number of times each stage ran in profiled reruns.',
+              '# TYPE socioecon_stage_calls_total counter']
+    lines += [f'socioecon_stage_calls_total{{stage="{_escape(name)}"}} {count}' for name, (count, _) in totals]
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(label):
+    return label.replace('\\', '\\\\').replace('"', '\\"')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics_text().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port):
+    """Serve `metrics_text()` on the given port from a daemon thread; later calls are no-ops."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((METRICS_HOST, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
@@ -0,0 +1,195 @@
+"""Data-quality flags for every cell of the panel, computed once when a Panel is built.
+
+The checks are declared as tables of expected ranges, non-decreasing series, shares that add
+up to 100 and metrics that mix units, plus `@consistency(columns)` formulas relating metrics
+from different sources. They run vectorized over the whole panel when the data is loaded or
+refreshed, and each cell's result is kept as a bitmask of the flags below, so charts filter or
+mark flagged points by reading the mask instead of re-checking the data.
+
+A flag marks a suspicious value, not a wrong one: the values themselves are never changed.
+"""
+import numpy as np
+import pandas as pd
+
+RANGE = 1
+DECREASE = 2
+SHARES = 4
+SCALE = 8
+INCONSISTENT = 16
+
+FLAG_NAMES = {
+    RANGE: "outside the expected range",
+    DECREASE: "drops where the series should not",
+    SHARES: "shares do not add up to 100",
+    SCALE: "off the metric's usual scale",
+    INCONSISTENT: "inconsistent with related metrics",
+}
+
+PERCENT = (0, 100)
+NON_NEGATIVE = (0, None)
+
+# Inclusive (low, high) bounds of each metric; None leaves that side open.
+RANGES = {
+    'gdp_trillions_usd': NON_NEGATIVE,
+    'gdp_per_capita_usd': NON_NEGATIVE,
+    'population_millions': NON_NEGATIVE,
+    'urban_population': PERCENT,
+    'life_expectancy_years': (0, 120),
+    'healthcare_expenditure_per_capita_usd': NON_NEGATIVE,
+    'doctor_to_patient_ratio': NON_NEGATIVE,
+    'literacy_rate': PERCENT,
+    'education_expenditure_gdp': PERCENT,
+    'internet_penetration': PERCENT,
+    'smartphone_adoption': PERCENT,
+    'energy_consumption_twh': NON_NEGATIVE,
+    'renewable_energy_share': PERCENT,
+    'military_expenditure_billion_usd': NON_NEGATIVE,
+    'active_military_personnel': NON_NEGATIVE,
+    'co2_emissions_million_metric_tons': NON_NEGATIVE,
+    'forest_coverage': PERCENT,
+    'number_of_airports': NON_NEGATIVE,
+    'road_network_length_km': NON_NEGATIVE,
+    'public_transport_usage': PERCENT,
+    'hdi': (0, 1),
+    'gender_equality_index': (0, 1),
+    'poverty_rate': PERCENT,
+    'international_visitors_millions': NON_NEGATIVE,
+    'tourism_revenue_billion_usd': NON_NEGATIVE,
+    'agricultural_land': PERCENT,
+    'unemployment_rate': PERCENT,
+    'labor_force_participation_rate': PERCENT,
+    'crime_rate': NON_NEGATIVE,
+    'corruption_perception_index': PERCENT,
+    'freedom_of_press_index': NON_NEGATIVE,
+    'voting_participation_rate': PERCENT,
+    'exports_millions_usd': NON_NEGATIVE,
+    'imports_millions_usd': NON_NEGATIVE,
+    'agriculture_hunting_forestry_fishing_pct_gross': PERCENT,
+    'industry_pct_gross': PERCENT,
+    'services_pct_gross': PERCENT,
+    'renewable_energy_twh': NON_NEGATIVE,
+    'non_renewable_energy_twh': NON_NEGATIVE,
+    'education_expenditure_per_capita_usd': NON_NEGATIVE,
+    'military_expenditure_per_capita_usd': NON_NEGATIVE,
+    'remaining_gdp_per_capita_usd': NON_NEGATIVE,
+}
+
+# Metrics that should not fall from one year to the next within a country, with the relative
+# drop tolerated before the later year is flagged.
+NON_DECREASING = {
+    'road_network_length_km': 0.05,
+    'internet_penetration': 0.05,
+}
+
+# Groups of percentage shares that should add up to 100, with the tolerance in points.
+SHARE_GROUPS = [
+    (('agriculture_hunting_forestry_fishing_pct_gross', 'industry_pct_gross', 'services_pct_gross'), 1.0),
+]
+
+# Metrics known to mix units. A value more than `SCALE_DECADES` orders of magnitude away from the
+# previous year of the same country is flagged as a unit break; differences between countries are
+# left alone, since they mostly reflect country size.
+MIXED_SCALE = ['doctor_to_patient_ratio', 'active_military_personnel']
+SCALE_DECADES = 1.0
+
+CONSISTENCY = []
+
+
+def consistency(columns):
+    """Declare a check over `columns` that returns a row mask; every column of a failing row is flagged."""
+    def register(check):
+        CONSISTENCY.append((tuple(columns), check))
+        return check
+    return register
+
+
+@consistency(['exports_millions_usd', 'imports_millions_usd', 'gdp_trillions_usd'])
+def trade_openness(data):
+    # UN SYB trade against the Kaggle GDP: total trade between 2% and 400% of GDP.
+    openness = (data['exports_millions_usd'] + data['imports_millions_usd']) / (data['gdp_trillions_usd'] * 1e6)
+    return openness.notna() & ~openness.between(0.02, 4.0)
+
+
+@consistency(['gdp_trillions_usd', 'gdp_per_capita_usd', 'population_millions'])
+def gdp_identity(data):
+    # GDP should be GDP per capita times population, within 25%.
+    ratio = data['gdp_trillions_usd'] * 1e6 / (data['gdp_per_capita_usd'] * data['population_millions'])
+    return ratio.notna() & ~ratio.between(0.75, 1.25)
+
+
+def describe(bits):
+    """The names of the flags set in `bits`, joined for a hover label."""
+    return ", ".join(name for flag, name in FLAG_NAMES.items() if bits & flag)
+
+
+class Quality:
+    """Per-cell quality flags of a panel-ordered frame (`Panel.data`).
+
+    `flags` is a uint8 (rows x metrics) matrix of `FLAG_NAMES` bits in the frame's row order,
+    stored column-major so the flags of one metric are contiguous. Lookups take any selection
+    of the frame's rows, e.g. from `Panel.select`, and find them by index label.
+    """
+
+    def __init__(self, data, metrics):
+        self.metrics = list(metrics)
+        self._columns = {metric: i for i, metric in enumerate(self.metrics)}
+        self._index = data.index
+        self.flags = np.zeros((len(data), len(self.metrics)), dtype=np.uint8, order='F')
+
+        for metric, (low, high) in RANGES.items():
+            if metric in self._columns:
+                values = data[metric].to_numpy(dtype=np.float64)
+                self._flag(metric, RANGE, ((values < low) if low is not None else False)
+                           | ((values > high) if high is not None else False))
+
+        # Rows are grouped by country and ordered by year, so the previous row is the previous year.
+        country = data['country'].to_numpy()
+        same_country = np.r_[False, country[1:] == country[:-1]]
+        for metric, tolerance in NON_DECREASING.items():
+            if metric in self._columns:
+                values = data[metric].to_numpy(dtype=np.float64)
+                previous = np.r_[np.nan, values[:-1]]
+                self._flag(metric, DECREASE, same_country & (values < previous * (1 - tolerance)))
+
+        for columns, tolerance in SHARE_GROUPS:
+            if all(column in self._columns for column in columns):
+                total = data[list(columns)].to_numpy(dtype=np.float64).sum(axis=1)
+                for column in columns:
+                    self._flag(column, SHARES, np.abs(total - 100) > tolerance)
+
+        for metric in MIXED_SCALE:
+            if metric in self._columns:
+                values = data[metric].to_numpy(dtype=np.float64)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    magnitude = np.log10(np.where(values > 0, values, np.nan))
+                jump = np.abs(magnitude - np.r_[np.nan, magnitude[:-1]])
+                self._flag(metric, SCALE, same_country & (jump > SCALE_DECADES))
+
+        for columns, check in CONSISTENCY:
+            if all(column in self._columns for column in columns):
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    failing = check(data).to_numpy(dtype=bool)
+                for column in columns:
+                    self._flag(column, INCONSISTENT, failing)
+
+    def _flag(self, metric, flag, mask):
+        # Comparisons against NaN are False, so missing values are never flagged.
+        self.flags[np.asarray(mask, dtype=bool), self._columns[metric]] |= flag
+
+    def bits(self, frame, metrics):
+        """Flags of `frame`'s rows, OR-ed over `metrics`; metrics without checks contribute none."""
+        columns = [self._columns[metric] for metric in metrics if metric in self._columns]
+        if not columns:
+            return np.zeros(len(frame), dtype=np.uint8)
+        rows = self._index.get_indexer(frame.index)
+        return np.bitwise_or.reduce(self.flags[np.ix_(rows, columns)], axis=1)
+
+    def flagged(self, frame, metrics):
+        """Mask of `frame`'s rows where any of `metrics` has a flag."""
+        return self.bits(frame, metrics) != 0
+
+    def summary(self):
+        """Number of flagged values per metric and flag, for the metrics with any flags."""
+        counts = pd.DataFrame({name: ((self.flags & flag) != 0).sum(axis=0) for flag, name in FLAG_NAMES.items()},
+                              index=pd.Index(self.metrics, name='metric'))
+        return counts[counts.sum(axis=1) > 0]
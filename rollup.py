@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+import profiling
+
+
+class Rollup:
+    """Per-country year-range aggregates of every numeric metric, answered without a groupby.
+
+    Each (country, year) cell is reduced once to its sum, value count, row count, min and max.
+    Sums and counts are stored as running totals along the year axis, so the total over any
+    year range is the difference of two entries. Min and max are stored as sparse tables
+    (the extreme over every power-of-two run of years), so any range is covered by two
+    overlapping runs. Every query is a constant number of array reads per country.
+
+    Results match `groupby('country')[metric].agg(...)` over the same year filter: missing
+    values are skipped, and a country with rows in the range but no values gets NaN.
+    """
+
+    def __init__(self, panel, metrics=None):
+        data = panel.data
+        self.metrics = list(panel.metrics if metrics is None else metrics)
+        self.countries = pd.Index(panel.countries, name='country')
+        self.years = panel.years
+        self._columns = {metric: i for i, metric in enumerate(self.metrics)}
+
+        shape = (len(self.countries), len(self.years), len(self.metrics))
+        country_codes = self.countries.get_indexer(data['country'])
+        year_codes = np.searchsorted(self.years, data['year'].to_numpy())
+        values = data[self.metrics].to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        cell = (country_codes, year_codes)
+
+        sums = np.zeros(shape)
+        np.add.at(sums, cell, np.where(present, values, 0.0))
+        counts = np.zeros(shape, dtype=np.int64)
+        np.add.at(counts, cell, present)
+        rows = np.zeros(shape[:2], dtype=np.int64)
+        np.add.at(rows, cell, 1)
+        mins = np.full(shape, np.nan)
+        np.fmin.at(mins, cell, values)
+        maxs = np.full(shape, np.nan)
+        np.fmax.at(maxs, cell, values)
+
+        # A leading zero row lets a range [lo, hi) be read as cum[hi] - cum[lo].
+        self._sums = _running_total(sums)
+        self._counts = _running_total(counts)
+        self._rows = _running_total(rows)
+        self._mins = _sparse_table(mins, np.fmin)
+        self._maxs = _sparse_table(maxs, np.fmax)
+
+    def _bounds(self, years):
+        lo = int(np.searchsorted(self.years, years[0], side='left'))
+        hi = int(np.searchsorted(self.years, years[1], side='right'))
+        return lo, hi
+
+    def _result(self, values, metric, lo, hi, countries):
+        # Drop countries with no rows in the range, as a groupby over the filtered frame would.
+        keep = self._rows[:, hi] - self._rows[:, lo] > 0
+        if countries is not None:
+            keep &= self.countries.isin(countries)
+        return pd.Series(values, index=self.countries, name=metric)[keep]
+
+    @profiling.timed('aggregate')
+    def count(self, metric, years, countries=None):
+        """Number of non-missing values per country within the inclusive (start, end) year range."""
+        lo, hi = self._bounds(years)
+        column = self._columns[metric]
+        totals = self._counts[:, hi, column] - self._counts[:, lo, column]
+        return self._result(totals, metric, lo, hi, countries)
+
+    @profiling.timed('aggregate')
+    def sum(self, metric, years, countries=None):
+        """Sum of the values per country within the inclusive (start, end) year range."""
+        lo, hi = self._bounds(years)
+        column = self._columns[metric]
+        totals = self._sums[:, hi, column] - self._sums[:, lo, column]
+        return self._result(totals, metric, lo, hi, countries)
+
+    @profiling.timed('aggregate')
+    def mean(self, metric, years, countries=None):
+        """Mean of the values per country within the inclusive (start, end) year range."""
+        lo, hi = self._bounds(years)
+        column = self._columns[metric]
+        totals = self._sums[:, hi, column] - self._sums[:, lo, column]
+        counts = self._counts[:, hi, column] - self._counts[:, lo, column]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, totals / counts, np.nan)
+        return self._result(means, metric, lo, hi, countries)
+
+    @profiling.timed('aggregate')
+    def min(self, metric, years, countries=None):
+        """Smallest value per country within the inclusive (start, end) year range."""
+        return self._extreme(self._mins, np.fmin, metric, years, countries)
+
+    @profiling.timed('aggregate')
+    def max(self, metric, years, countries=None):
+        """Largest value per country within the inclusive (start, end) year range."""
+        return self._extreme(self._maxs, np.fmax, metric, years, countries)
+
+    def _extreme(self, table, combine, metric, years, countries):
+        lo, hi = self._bounds(years)
+        column = self._columns[metric]
+        if hi <= lo:
+            values = np.full(len(self.countries), np.nan)
+        else:
+            level = (hi - lo).bit_length() - 1
+            width = 1 << level
+            values = combine(table[level][:, lo, column], table[level][:, hi - width, column])
+        return self._result(values, metric, lo, hi, countries)
+
+
+def _running_total(cells):
+    totals = np.zeros((cells.shape[0], cells.shape[1] + 1) + cells.shape[2:], dtype=cells.dtype)
+    np.cumsum(cells, axis=1, out=totals[:, 1:])
+    return totals
+
+
+def _sparse_table(cells, combine):
+    # levels[k][:, i] is the extreme over years [i, i + 2**k); runs past the end are never read.
+    levels = [cells]
+    width = 1
+    while width * 2 <= cells.shape[1]:
+        previous = levels[-1]
+        level = previous.copy()
+        level[:, :-width] = combine(previous[:, :-width], previous[:, width:])
+        levels.append(level)
+        width *= 2
+    return levels
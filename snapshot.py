@@ -0,0 +1,80 @@
+"""Typed, memory-mappable snapshot of the working dataset.
+
+Build it once with `python snapshot.py` (optionally passing the CSV and output paths).
+The dashboard picks the snapshot up automatically when it is at least as new as the CSV.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+DEFAULT_CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'working_df.csv')
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'working_df.feather')
+
+# float32 is only used for a column when every value round-trips within this relative tolerance.
+FLOAT32_RTOL = 1e-6
+
+
+def is_snapshot(source):
+    return source.endswith('.feather')
+
+
+def snapshot_path_for(csv_path):
+    return os.path.splitext(csv_path)[0] + '.feather'
+
+
+def compact_dtypes(data):
+    """Return a copy of the working dataset with compact column types.
+
+    The one-hot `country_*` block is dropped (it duplicates `country`), `country` becomes
+    a categorical, `year` becomes int16, and float columns are narrowed to float32 when
+    that does not lose precision.
+    """
+    data = data.drop(columns=[col for col in data.columns if col.startswith('country_')])
+
+    columns = {}
+    for col in data.columns:
+        values = data[col]
+        if col == 'country':
+            values = values.astype('category')
+        elif col == 'year':
+            values = values.astype(np.int16)
+        elif values.dtype == np.float64:
+            with np.errstate(over='ignore'):
+                narrowed = values.astype(np.float32)
+            if np.allclose(narrowed.astype(np.float64), values, rtol=FLOAT32_RTOL, atol=0, equal_nan=True):
+                values = narrowed
+        columns[col] = values
+
+    return pd.DataFrame(columns)
+
+
+def build_snapshot(csv_path=DEFAULT_CSV_PATH, snapshot_path=None):
+    snapshot_path = snapshot_path or snapshot_path_for(csv_path)
+    data = compact_dtypes(pd.read_csv(csv_path))
+    table = pa.Table.from_pandas(data, preserve_index=False)
+
+    # Uncompressed Feather v2 is what allows the reader to memory-map the columns in place.
+    tmp_path = snapshot_path + '.tmp'
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, snapshot_path)
+    return snapshot_path
+
+
+def load_snapshot(snapshot_path=DEFAULT_SNAPSHOT_PATH):
+    """Memory-map a snapshot and wrap it as a DataFrame.
+
+    Numeric columns without nulls are zero-copy views onto the mapped file, so every
+    worker on the machine shares the same page-cache pages.
+    """
+    table = feather.read_table(snapshot_path, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+if __name__ == '__main__':
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV_PATH
+    snapshot_path = sys.argv[2] if len(sys.argv) > 2 else None
+    print(f"Wrote {build_snapshot(csv_path, snapshot_path)}")
@@ -0,0 +1,35 @@
+import os
+
+import plotly.express as px
+from streamlit.testing.v1 import AppTest
+
+import data_loader
+import figures
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'midterm.py')
+CSV_PATH = os.path.join(os.path.dirname(APP_PATH), 'working_df.csv')
+
+
+def test_background_charts_are_rebuilt_after_the_figure_cache_is_cleared(monkeypatch):
+    monkeypatch.setenv(data_loader.SOURCE_ENV_VAR, CSV_PATH)
+    data_loader.clear_cache()
+    figures.clear_cache()
+    calls = []
+    scatter_3d = px.scatter_3d
+    monkeypatch.setattr(px, 'scatter_3d', lambda *args, **kwargs: calls.append(1) or scatter_3d(*args, **kwargs))
+
+    app = AppTest.from_file(APP_PATH, default_timeout=120)
+    app.query_params['view'] = 'Sandbox Mode'
+    app.query_params['metrics'] = ['hdi', 'poverty_rate', 'inflation_rate']
+    app.run()
+    assert not app.exception
+    assert len(calls) == 1
+    # The slot is released once the chart is shown; no finished job (or its panel) is kept.
+    assert app.session_state['background_jobs'] == {}
+
+    app.run()
+    assert len(calls) == 1
+    figures.clear_cache()
+    app.run()
+    assert len(calls) == 2
+    data_loader.clear_cache()
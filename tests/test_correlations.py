@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import correlations
+import data_loader
+from derived import lineage
+
+
+def sample(gaps=True, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=200)
+    frame = pd.DataFrame({
+        'a': base + rng.normal(scale=0.5, size=200),
+        'b': 3 * base + rng.normal(size=200) + 10,
+        'c': rng.exponential(size=200),
+        'd': -base ** 3 + rng.normal(size=200),
+    })
+    if gaps:
+        frame = frame.mask(rng.random(frame.shape) < 0.2)
+    return frame
+
+
+def test_pair_stats_match_pandas_and_polyfit_with_gaps():
+    frame = sample()
+    count, pearson, slope, intercept = correlations.pair_stats(frame.to_numpy())
+    np.testing.assert_allclose(pearson, frame.corr().to_numpy(), rtol=1e-9, atol=1e-12)
+    for i, x in enumerate(frame.columns):
+        for j, y in enumerate(frame.columns):
+            if i == j:
+                continue
+            joint = frame[[x, y]].dropna()
+            assert count[i, j] == len(joint)
+            expected_slope, expected_intercept = np.polyfit(joint[x], joint[y], 1)
+            assert slope[i, j] == pytest.approx(expected_slope, rel=1e-9)
+            assert intercept[i, j] == pytest.approx(expected_intercept, rel=1e-9, abs=1e-12)
+
+
+def test_spearman_matches_pandas_without_gaps():
+    frame = sample(gaps=False)
+    spearman = correlations.group_stats(frame.to_numpy())[2]
+    np.testing.assert_allclose(spearman, frame.corr(method='spearman').to_numpy(), rtol=1e-9)
+
+
+def test_strongest_leaves_out_pairs_related_by_formula():
+    assert {'gdp_per_capita_usd', 'education_expenditure_gdp', 'military_expenditure_billion_usd'} \
+        <= lineage('remaining_gdp_per_capita_usd')
+    panel = data_loader.load_panel(data_loader.DEFAULT_LOCAL_PATH)
+    years = (int(panel.years[0]), int(panel.years[-1]))
+    top = correlations.strongest(panel, tuple(panel.countries), years, top=50)
+    assert len(top) == 50
+    for x, y in zip(top['x'], top['y']):
+        assert x not in lineage(y) and y not in lineage(x)
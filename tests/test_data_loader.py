@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+
+
+def base():
+    return pd.DataFrame({
+        'country': ['A', 'A', 'B'],
+        'year': [2000, 2001, 2000],
+        'hdi': [0.5, 0.6, 0.7],
+        'gdp_per_capita_usd': [100.0, 110.0, 200.0],
+    })
+
+
+def test_apply_delta_appends_new_keys():
+    delta = pd.DataFrame({'country': ['A', 'C'], 'year': [2002, 2000], 'hdi': [0.65, 0.4]})
+    merged = data_loader.apply_delta(base(), delta)
+    assert len(merged) == 5
+    assert list(merged.columns) == list(base().columns)
+    new = merged.set_index(['country', 'year'])
+    assert new.loc[('A', 2002), 'hdi'] == 0.65
+    assert np.isnan(new.loc[('C', 2000), 'gdp_per_capita_usd'])
+
+
+def test_apply_delta_revises_only_non_missing_values():
+    delta = pd.DataFrame({'country': ['A', 'A'], 'year': [2001, 2001],
+                          'hdi': [0.9, 0.95], 'gdp_per_capita_usd': [np.nan, np.nan]})
+    merged = data_loader.apply_delta(base(), delta).set_index(['country', 'year'])
+    assert len(merged) == 3
+    # The last duplicate wins, and missing delta values keep the current ones.
+    assert merged.loc[('A', 2001), 'hdi'] == 0.95
+    assert merged.loc[('A', 2001), 'gdp_per_capita_usd'] == 110.0
+    assert merged.loc[('B', 2000), 'hdi'] == 0.7
+
+
+def test_apply_delta_adds_new_columns():
+    delta = pd.DataFrame({'country': ['B'], 'year': [2000], 'crime_rate': [12.0]})
+    merged = data_loader.apply_delta(base(), delta).set_index(['country', 'year'])
+    assert merged.loc[('B', 2000), 'crime_rate'] == 12.0
+    assert np.isnan(merged.loc[('A', 2000), 'crime_rate'])
+
+
+def test_load_panel_applies_new_deltas_and_bumps_the_version(tmp_path):
+    source = tmp_path / 'working_df.csv'
+    base().to_csv(source, index=False)
+    (tmp_path / 'deltas').mkdir()
+    data_loader.clear_cache()
+
+    first = data_loader.load_panel(str(source))
+    assert first.version == 0
+    assert first.row('A', 2002) is None
+
+    pd.DataFrame({'country': ['A'], 'year': [2002], 'hdi': [0.7]}).to_csv(tmp_path / 'deltas' / '001.csv', index=False)
+    second = data_loader.load_panel(str(source))
+    assert second.version == 1
+    assert first.retired and not second.retired
+    assert second.row('A', 2002)['hdi'] == 0.7
+    assert data_loader.load_panel(str(source)) is second
+    data_loader.clear_cache()
+
+
+def write(path, values):
+    pd.DataFrame({'country': ['A'] * len(values), 'year': range(2000, 2000 + len(values)),
+                  'hdi': values}).to_csv(path, index=False)
+
+
+def test_local_file_is_reloaded_only_when_it_changes(tmp_path):
+    path = str(tmp_path / 'working_df.csv')
+    write(path, [0.5, 0.6])
+    data_loader.clear_cache()
+
+    first = data_loader.load_working_data(path)
+    assert data_loader.load_working_data(path) is first
+
+    write(path, [0.5, 0.6, 0.7])
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000_000))
+    second = data_loader.load_working_data(path)
+    assert second is not first
+    assert len(second) == 3
+    data_loader.clear_cache()
+
+
+def test_remote_source_is_rechecked_only_after_the_interval(monkeypatch):
+    url = 'https://example.invalid/working_df.csv'
+    now = [1000.0]
+    checks, reads = [], []
+    versions = iter(['v1', 'v1', 'v2'])
+    monkeypatch.setattr(data_loader.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(data_loader, 'source_version', lambda source: checks.append(source) or next(versions))
+    monkeypatch.setattr(data_loader, 'read_source', lambda source: reads.append(source) or pd.DataFrame({'n': [len(reads)]}))
+    data_loader.clear_cache()
+
+    first = data_loader.load_working_data(url)
+    now[0] += data_loader.REMOTE_CHECK_INTERVAL - 1
+    assert data_loader.load_working_data(url) is first
+    assert len(checks) == 1
+
+    now[0] += 2
+    assert data_loader.load_working_data(url) is first
+    assert (len(checks), len(reads)) == (2, 1)
+
+    now[0] += data_loader.REMOTE_CHECK_INTERVAL + 1
+    changed = data_loader.load_working_data(url)
+    assert changed is not first
+    assert (len(checks), len(reads)) == (3, 2)
+    data_loader.clear_cache()
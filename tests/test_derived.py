@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import derived
+
+WORKING_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'working_df.csv')
+
+
+def test_formulas_match_the_per_row_chart_arithmetic():
+    data = pd.read_csv(WORKING_CSV)
+    result = derived.add_derived(data)
+
+    # The arithmetic the charts used to do on each selected row before the metrics were derived.
+    for _, row in data.iterrows():
+        expected = {
+            'non_renewable_energy_twh': row['energy_consumption_twh'] * (1 - row['renewable_energy_share'] / 100),
+            'renewable_energy_twh': row['energy_consumption_twh'] * (row['renewable_energy_share'] / 100),
+            'education_expenditure_per_capita_usd': row['gdp_per_capita_usd'] * (row['education_expenditure_gdp'] / 100),
+            'military_expenditure_per_capita_usd': row['military_expenditure_billion_usd'] * 1000/(row['population_millions']),
+        }
+        expected['remaining_gdp_per_capita_usd'] = row['gdp_per_capita_usd'] - (
+            expected['education_expenditure_per_capita_usd'] + row['healthcare_expenditure_per_capita_usd']
+            + expected['military_expenditure_per_capita_usd'])
+        for name, value in expected.items():
+            np.testing.assert_allclose(result.at[row.name, name], value, rtol=1e-12, equal_nan=True, err_msg=name)
+
+
+def test_existing_metrics_are_kept_and_missing_inputs_are_skipped():
+    data = pd.DataFrame({
+        'energy_consumption_twh': [100.0, 200.0],
+        'renewable_energy_share': [10.0, 50.0],
+        'renewable_energy_twh': [1.0, 2.0],
+    })
+    result = derived.add_derived(data)
+
+    assert list(result['renewable_energy_twh']) == [1.0, 2.0]
+    assert list(result['non_renewable_energy_twh']) == [90.0, 100.0]
+    assert 'education_expenditure_per_capita_usd' not in result.columns
+    assert 'remaining_gdp_per_capita_usd' not in result.columns
+    assert 'non_renewable_energy_twh' not in data.columns
+
+    recomputed = derived.add_derived(derived.drop_derived(result))
+    assert list(recomputed['renewable_energy_twh']) == [10.0, 100.0]
+
+
+def test_lineage_follows_derived_inputs():
+    assert derived.lineage('remaining_gdp_per_capita_usd') == {
+        'gdp_per_capita_usd', 'education_expenditure_per_capita_usd', 'education_expenditure_gdp',
+        'healthcare_expenditure_per_capita_usd', 'military_expenditure_per_capita_usd',
+        'military_expenditure_billion_usd', 'population_millions',
+    }
+    assert derived.lineage('hdi') == set()
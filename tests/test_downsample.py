@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+import downsample
+
+
+def frame(sizes):
+    return pd.DataFrame({
+        'country': np.repeat([f'C{i}' for i in range(len(sizes))], sizes),
+        'year': np.concatenate([np.arange(size) for size in sizes]),
+        'value': np.random.default_rng(0).normal(size=sum(sizes)),
+    })
+
+
+def test_stratified_keeps_every_group_within_budget():
+    data = frame([5000, 3000, 10, 1])
+    sampled = downsample.stratified(data, 1000)
+    assert len(sampled) <= 1000 + 4
+    assert set(sampled['country']) == set(data['country'])
+    assert sampled.index.is_monotonic_increasing
+    assert downsample.stratified(data, len(data)) is data
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(10_000)
+    y = np.sin(x / 300.0)
+    y[4321] = 50
+    kept = downsample.lttb(x, y, 200)
+    assert len(kept) == 200
+    assert kept[0] == 0 and kept[-1] == len(x) - 1
+    assert np.all(np.diff(kept) > 0)
+    assert 4321 in kept
+    np.testing.assert_array_equal(downsample.lttb(x[:50], y[:50], 200), np.arange(50))
+
+
+def test_lttb_by_group_splits_the_budget():
+    data = frame([4000, 2000, 50])
+    sampled = downsample.lttb_by_group(data, 'year', 'value', 600)
+    counts = sampled['country'].value_counts()
+    assert len(sampled) <= 600
+    # Budgets follow group size, with at least three points so every line keeps its shape.
+    assert counts['C0'] > counts['C1'] > counts['C2'] >= 3
+    assert downsample.lttb_by_group(data, 'year', 'value', len(data)) is data
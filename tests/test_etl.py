@@ -0,0 +1,32 @@
+import shutil
+
+import pandas as pd
+
+import etl
+
+
+def test_pipeline_only_recomputes_changed_countries(tmp_path):
+    kaggle_path = tmp_path / 'kaggle.csv'
+    shutil.copy(etl.KAGGLE_PATH, kaggle_path)
+    pipeline = etl.Pipeline(kaggle_path=str(kaggle_path), cache_dir=str(tmp_path / 'cache'), chunksize=1000)
+
+    first = pipeline.run()
+    assert sorted(pipeline.recomputed) == sorted(first['country'].unique())
+    assert first['literacy_rate'].max() <= 100
+
+    again = pipeline.run()
+    assert pipeline.recomputed == []
+    pd.testing.assert_frame_equal(again, first)
+
+    raw = pd.read_csv(kaggle_path)
+    india = raw['Country'] == 'India'
+    raw.loc[india, 'Inflation Rate (%)'] += 1
+    raw.to_csv(kaggle_path, index=False)
+
+    changed = pipeline.run()
+    assert pipeline.recomputed == ['India']
+    fresh = etl.Pipeline(kaggle_path=str(kaggle_path), cache_dir=str(tmp_path / 'fresh')).run()
+    pd.testing.assert_frame_equal(changed, fresh)
+    rows = changed['country'] == 'India'
+    pd.testing.assert_series_equal(changed.loc[rows, 'inflation_rate'], first.loc[rows, 'inflation_rate'] + 1)
+    pd.testing.assert_frame_equal(changed[~rows], first[~rows])
@@ -0,0 +1,53 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_loader
+import panel_store
+import quality
+from benchmark import synthetic_panel
+from panel import Panel
+
+
+def test_store_round_trip(tmp_path):
+    data = synthetic_panel(countries=5, years=12, metrics=30, seed=5)
+    data['year'] = data['year'].astype(float)
+    data.loc[3, 'hdi'] = np.nan
+    panel = Panel(data.sample(frac=1, random_state=6))
+
+    path = panel_store.write_store(panel, str(tmp_path / 'data.panel'))
+    assert panel_store.is_store(path)
+    attached = panel_store.attach_store(path)
+    reloaded = Panel(attached)
+
+    assert reloaded.countries == panel.countries
+    assert reloaded.metrics == panel.metrics
+    np.testing.assert_array_equal(reloaded.years, panel.years)
+    pd.testing.assert_series_equal(reloaded.data['year'].astype(np.int64), panel.data['year'], check_names=False)
+    np.testing.assert_allclose(reloaded.data[panel.metrics].to_numpy(dtype=float),
+                               panel.data[panel.metrics].to_numpy(dtype=float), rtol=1e-6)
+    # Stored rows are already in panel order, so the metrics stay mapped instead of copied.
+    assert not reloaded.data['hdi'].to_numpy().flags.writeable
+
+
+def test_deltas_over_a_store_recompute_derived_metrics(tmp_path):
+    csv_path = tmp_path / 'working_df.csv'
+    shutil.copy(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'working_df.csv'), csv_path)
+    store_path = panel_store.build_store(str(csv_path))
+    (tmp_path / 'deltas').mkdir()
+    pd.DataFrame({'country': ['USA', 'USA'], 'year': [2010, 2024], 'gdp_per_capita_usd': [1.0, 50000.0],
+                  'education_expenditure_gdp': [np.nan, 5.0]}).to_csv(tmp_path / 'deltas' / '001.csv', index=False)
+    data_loader.clear_cache()
+
+    from_csv, from_store = data_loader.load_panel(str(csv_path)), data_loader.load_panel(store_path)
+    for panel in (from_csv, from_store):
+        revised = panel.row('USA', 2010)['remaining_gdp_per_capita_usd']
+        assert revised == pytest.approx(from_csv.row('USA', 2010)['remaining_gdp_per_capita_usd'], rel=1e-6)
+        assert revised < 0
+        assert panel.row('USA', 2024)['education_expenditure_per_capita_usd'] == pytest.approx(2500.0)
+        selected = panel.select(['USA'], (2010, 2010))
+        assert panel.quality.bits(selected, ['remaining_gdp_per_capita_usd'])[0] & quality.RANGE
+    data_loader.clear_cache()
@@ -0,0 +1,26 @@
+import socket
+import urllib.request
+
+import profiling
+
+
+def test_stages_nest_and_stop_with_the_rerun():
+    rerun = profiling.start_rerun()
+    with profiling.stage("build chart"):
+        with profiling.stage("filter"):
+            pass
+    rerun.finish()
+    with profiling.stage("after"):
+        pass
+    assert [name for name, _ in rerun.stages] == ["build chart / filter", "build chart", "rerun"]
+    assert 'socioecon_stage_calls_total{stage="build chart / filter"}' in profiling.metrics_text()
+
+
+def test_metrics_are_served_on_loopback_only():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    server = profiling.serve_metrics(port)
+    assert server.server_address[0] == '127.0.0.1'
+    with urllib.request.urlopen(f'http://127.0.0.1:{server.server_address[1]}/metrics', timeout=5) as response:
+        assert b'socioecon_stage_seconds_total' in response.read()
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+import figures
+import quality
+from panel import Panel
+
+
+def test_flags_are_precomputed_per_cell():
+    data = pd.DataFrame({
+        'country': ['A', 'A', 'A', 'B'],
+        'year': [2000, 2001, 2002, 2000],
+        'literacy_rate': [99.0, 101.0, np.nan, 80.0],
+        'road_network_length_km': [1000.0, 800.0, 810.0, 500.0],
+        'agriculture_hunting_forestry_fishing_pct_gross': [10.0, 10.0, 10.0, 10.0],
+        'industry_pct_gross': [30.0, 30.0, 30.0, 20.0],
+        'services_pct_gross': [60.0, 60.0, 60.0, 60.0],
+    })
+    panel = Panel(data)
+    bits = panel.quality.bits(panel.data, ['literacy_rate'])
+    assert list(bits) == [0, quality.RANGE, 0, 0]
+
+    bits = panel.quality.bits(panel.data, ['road_network_length_km'])
+    assert list(bits) == [0, quality.DECREASE, 0, 0]
+
+    selected = panel.select(['B'], (2000, 2000))
+    assert list(panel.quality.bits(selected, ['industry_pct_gross'])) == [quality.SHARES]
+    assert not panel.quality.flagged(selected, ['literacy_rate']).any()
+    assert panel.quality.summary().loc['literacy_rate', quality.FLAG_NAMES[quality.RANGE]] == 1
+
+
+def test_scale_breaks_are_found_within_a_country_not_across_countries():
+    data = pd.DataFrame({
+        'country': ['Big'] * 3 + ['Small'] * 3,
+        'year': [2000, 2001, 2002] * 2,
+        'active_military_personnel': [1_200_000.0, 1_250_000.0, 1_300.0, 55_000.0, 56_000.0, 57_000.0],
+    })
+    panel = Panel(data)
+    bits = panel.quality.bits(panel.data, ['active_military_personnel'])
+    assert list(bits) == [0, 0, quality.SCALE, 0, 0, 0]
+
+
+def test_hidden_points_are_left_out_of_the_average_pie():
+    data = pd.DataFrame({
+        'country': ['A', 'A', 'B', 'B'],
+        'year': [2000, 2001, 2000, 2001],
+        'literacy_rate': [90.0, 130.0, 80.0, 70.0],
+    })
+    panel = Panel(data)
+    shown = figures.metric_average_pie(panel, ('A', 'B'), (2000, 2001), 'literacy_rate', 'show')
+    hidden = figures.metric_average_pie(panel, ('A', 'B'), (2000, 2001), 'literacy_rate', 'hide')
+    assert dict(zip(shown.data[0].labels, shown.data[0].values)) == {'A': 110.0, 'B': 75.0}
+    assert dict(zip(hidden.data[0].labels, hidden.data[0].values)) == {'A': 90.0, 'B': 75.0}
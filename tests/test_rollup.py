@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from benchmark import synthetic_panel
+from panel import Panel
+
+
+@pytest.fixture(scope='module')
+def panel():
+    data = synthetic_panel(countries=8, years=30, metrics=30, seed=1)
+    rng = np.random.default_rng(2)
+    # Gaps, including a country-year range with no values at all.
+    data.loc[rng.random(len(data)) < 0.2, 'hdi'] = np.nan
+    data.loc[(data['country'] == 'Country 0003') & data['year'].between(2010, 2014), 'hdi'] = np.nan
+    return Panel(data.sample(frac=1, random_state=3))
+
+
+@pytest.mark.parametrize('how', ['mean', 'sum', 'count', 'min', 'max'])
+def test_rollup_matches_groupby_on_random_year_ranges(panel, how):
+    rng = np.random.default_rng(4)
+    for _ in range(25):
+        start, end = sorted(rng.integers(2000, 2030, 2))
+        countries = list(rng.choice(panel.countries, size=rng.integers(1, len(panel.countries) + 1), replace=False))
+        for metric in ['hdi', 'gdp_per_capita_usd']:
+            in_range = panel.data[panel.data['year'].between(start, end) & panel.data['country'].isin(countries)]
+            expected = in_range.groupby('country', sort=False)[metric].agg(how)
+            actual = getattr(panel.rollup, how)(metric, (start, end), countries)
+            np.testing.assert_allclose(actual.reindex(expected.index).to_numpy(dtype=float),
+                                       expected.to_numpy(dtype=float), rtol=1e-9)
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+import snapshot
+
+
+def working_csv(tmp_path):
+    data = pd.DataFrame({
+        'country': ['A', 'A', 'B', 'B'],
+        'year': [2000, 2001, 2000, 2001],
+        'country_A': [1, 1, 0, 0],
+        'country_B': [0, 0, 1, 1],
+        'hdi': [0.5, 0.625, np.nan, 0.75],
+        'gdp_per_capita_usd': [100.0, 110.5, 200.25, 1e40],
+    })
+    path = str(tmp_path / 'working_df.csv')
+    data.to_csv(path, index=False)
+    return path
+
+
+def test_snapshot_has_compact_dtypes(tmp_path):
+    path = snapshot.build_snapshot(working_csv(tmp_path))
+    assert path == str(tmp_path / 'working_df.feather')
+    data = snapshot.load_snapshot(path)
+
+    assert not any(col.startswith('country_') for col in data.columns)
+    assert isinstance(data['country'].dtype, pd.CategoricalDtype)
+    assert data['year'].dtype == np.int16
+    # 1e40 overflows float32, so GDP per capita stays float64.
+    assert data['hdi'].dtype == np.float32
+    assert data['gdp_per_capita_usd'].dtype == np.float64
+
+
+def test_snapshot_round_trips_the_csv(tmp_path):
+    csv_path = working_csv(tmp_path)
+    original = pd.read_csv(csv_path)
+    data = snapshot.load_snapshot(snapshot.build_snapshot(csv_path))
+
+    assert list(data['country']) == list(original['country'])
+    np.testing.assert_array_equal(data['year'], original['year'])
+    for col in ('hdi', 'gdp_per_capita_usd'):
+        np.testing.assert_allclose(data[col].to_numpy(dtype=float), original[col], rtol=snapshot.FLOAT32_RTOL)
+
+
+def test_loader_prefers_a_snapshot_that_is_not_older_than_the_csv(tmp_path, monkeypatch):
+    csv_path = working_csv(tmp_path)
+    monkeypatch.setattr(data_loader, 'DEFAULT_LOCAL_PATH', csv_path)
+    monkeypatch.delenv(data_loader.SOURCE_ENV_VAR, raising=False)
+    assert data_loader.resolve_source() == csv_path
+
+    path = snapshot.build_snapshot(csv_path)
+    assert data_loader.resolve_source() == path
+    assert data_loader.read_source(path)['year'].dtype == np.int16
+
+    stat = os.stat(path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert data_loader.resolve_source() == csv_path
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trends import Trends
+
+METRICS = ['hdi', 'gdp']
+
+
+def series(countries=4, years=20, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({
+        'country': np.repeat([f'C{i}' for i in range(countries)], years),
+        'year': np.tile(np.arange(2000, 2000 + years), countries),
+        'hdi': rng.uniform(0.5, 0.9, countries * years),
+        'gdp': rng.uniform(100, 500, countries * years),
+    })
+    data.loc[rng.random(len(data)) < 0.15, 'gdp'] = np.nan
+    return data
+
+
+def test_fit_matches_polyfit():
+    data = series()
+    trends = Trends(data, METRICS)
+    table = trends.table()
+    for (country, metric), fit in table.iterrows():
+        rows = data[(data['country'] == country) & data[metric].notna()]
+        slope, intercept = np.polyfit(rows['year'] - trends.origin, rows[metric], 1)
+        assert fit['slope'] == pytest.approx(slope, rel=1e-9)
+        assert fit['intercept'] == pytest.approx(intercept, rel=1e-9)
+        assert fit['observations'] == len(rows)
+        first, last = rows.iloc[0], rows.iloc[-1]
+        cagr = (last[metric] / first[metric]) ** (1 / (last['year'] - first['year'])) - 1
+        assert fit['cagr'] == pytest.approx(cagr, rel=1e-9)
+
+
+def test_extend_matches_a_full_refit():
+    data = series(years=25)
+    old, new = data[data['year'] < 2018], data[data['year'] >= 2018]
+    extended = Trends(old, METRICS).extend(new)
+    refit = Trends(data, METRICS)
+    pd.testing.assert_frame_equal(extended.table(), refit.table(), rtol=1e-9)
+
+
+def test_extend_adds_new_countries_and_leaves_the_original():
+    data = series(countries=2)
+    trends = Trends(data, METRICS)
+    extra = series(countries=3, seed=1)
+    extra = extra[extra['country'] == 'C2']
+    extended = trends.extend(extra)
+    assert list(extended.countries) == ['C0', 'C1', 'C2']
+    assert list(trends.countries) == ['C0', 'C1']
+
+
+def test_line_forecasts_only_past_the_last_year():
+    trends = Trends(series(), METRICS)
+    full = trends.line('C0', 'hdi', (2000, 2019), horizon=5)
+    assert full['year'].iloc[-1] == 2024
+    assert full.loc[full['year'] <= 2019, 'lower'].isna().all()
+    assert full.loc[full['year'] > 2019, 'lower'].notna().all()
+
+    narrow = trends.line('C0', 'hdi', (2005, 2010))
+    assert list(narrow['year']) == list(range(2005, 2011))
+    assert narrow['lower'].isna().all()
+    assert trends.line('missing', 'hdi', (2000, 2019)).empty
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import data_loader
+import figures
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'midterm.py')
+CSV_PATH = os.path.join(os.path.dirname(APP_PATH), 'working_df.csv')
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # The CSV, not a local snapshot or store, so years come in as floats like on a fresh clone.
+    monkeypatch.setenv(data_loader.SOURCE_ENV_VAR, CSV_PATH)
+    data_loader.clear_cache()
+    figures.clear_cache()
+    yield AppTest.from_file(APP_PATH, default_timeout=120)
+    data_loader.clear_cache()
+
+
+def test_country_view_link_round_trip(app):
+    app.query_params['view'] = 'Country View'
+    app.query_params['year'] = '2005'
+    app.query_params['country'] = 'India'
+    app.run()
+    assert not app.exception
+    year, country = app.selectbox
+    assert (year.value, country.value) == (2005, 'India')
+
+    year.select(2007).run()
+    assert app.query_params['year'] == ['2007']
+    assert app.query_params['view'] == ['Country View']
+
+
+def test_mirror_keeps_debug_and_drops_defaults(app):
+    app.query_params['debug'] = '1'
+    app.run()
+    assert not app.exception
+    assert app.query_params['debug'] == ['1']
+
+    app.sidebar.radio[0].set_value('Sandbox Mode').run()
+    app.multiselect(key='metrics').set_value(['hdi']).run()
+    assert not app.exception
+    assert app.query_params['debug'] == ['1']
+    assert app.query_params['metrics'] == ['hdi']
+    assert 'years' not in app.query_params
+    assert [expander.label for expander in app.sidebar.expander] == ["Debug: rerun timings"]
+
+
+def test_sandbox_state_survives_a_shared_link(app):
+    app.query_params['view'] = 'Sandbox Mode'
+    app.query_params['metrics'] = ['hdi', 'poverty_rate']
+    app.query_params['years'] = ['2003', '2010']
+    app.query_params['log'] = '1'
+    app.run()
+    assert not app.exception
+    assert app.multiselect(key='metrics').value == ['hdi', 'poverty_rate']
+    assert app.slider(key='years').value == (2003, 2010)
+    assert app.checkbox(key='log').value
+
+
+def test_labelled_radios_keep_their_url_values(app):
+    app.query_params['view'] = 'Sandbox Mode'
+    app.query_params['metrics'] = ['hdi']
+    app.query_params['quality'] = 'mark'
+    app.run()
+    assert not app.exception
+    assert app.radio(key='quality').value == figures.QUALITY_MODES['mark']
+    assert app.query_params['quality'] == ['mark']
+
+    app.sidebar.radio[0].set_value('Stats View').run()
+    app.radio(key='method').set_value('Spearman').run()
+    assert not app.exception
+    assert app.query_params['method'] == ['spearman']
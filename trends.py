@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+# Years past the last observation that trend lines are continued as a forecast.
+FORECAST_HORIZON = 5
+
+# Two-sided ~95% band around the forecast, from the residual spread of the fit.
+FORECAST_Z = 1.96
+
+_STATISTICS = ('_n', '_t', '_y', '_tt', '_ty', '_yy')
+
+
+class Trends:
+    """Linear trends, growth rates and short forecasts for every (country, metric) series.
+
+    Each series is reduced to the sufficient statistics of a least-squares line over the year,
+    accumulated for all series at once, so fitting every series is one vectorized solve. The
+    fitted parameters are kept, and `extend` folds rows for new years into the statistics
+    without revisiting the old rows. Growth is the compound annual rate between the first and
+    the last observed value of a series.
+    """
+
+    def __init__(self, data, metrics, origin=None):
+        self.metrics = list(metrics)
+        self._columns = {metric: i for i, metric in enumerate(self.metrics)}
+        # Years are measured from a fixed origin so the sums stay well conditioned.
+        if origin is None:
+            origin = int(data['year'].min()) if len(data) else 0
+        self.origin = origin
+        self.countries = pd.Index([], dtype=object, name='country')
+
+        shape = (0, len(self.metrics))
+        for name in _STATISTICS:
+            setattr(self, name, np.zeros(shape))
+        self._first_t, self._last_t = np.full(shape, np.inf), np.full(shape, -np.inf)
+        self._first_y, self._last_y = np.full(shape, np.nan), np.full(shape, np.nan)
+        self._accumulate(data)
+
+    def extend(self, rows):
+        """A copy of these trends with `rows` for new (country, year) pairs folded in."""
+        extended = Trends.__new__(Trends)
+        extended.__dict__.update({key: value.copy() if isinstance(value, np.ndarray) else value
+                                  for key, value in self.__dict__.items()})
+        extended._accumulate(rows)
+        return extended
+
+    def _accumulate(self, data):
+        new_countries = pd.Index(pd.unique(data['country']), dtype=object).difference(self.countries, sort=False)
+        if len(new_countries):
+            self.countries = self.countries.append(pd.Index(new_countries, dtype=object, name='country'))
+            grow = np.zeros((len(new_countries), len(self.metrics)))
+            for name in _STATISTICS:
+                setattr(self, name, np.vstack([getattr(self, name), grow]))
+            self._first_t = np.vstack([self._first_t, grow + np.inf])
+            self._last_t = np.vstack([self._last_t, grow - np.inf])
+            self._first_y = np.vstack([self._first_y, grow + np.nan])
+            self._last_y = np.vstack([self._last_y, grow + np.nan])
+
+        codes = self.countries.get_indexer(data['country'])
+        t = data['year'].to_numpy(dtype=np.float64) - self.origin
+        values = data.reindex(columns=self.metrics).to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        y = np.where(present, values, 0.0)
+        t_present = np.where(present, t[:, None], 0.0)
+
+        for total, contribution in ((self._n, present), (self._t, t_present), (self._y, y),
+                                    (self._tt, t_present * t_present), (self._ty, t_present * y),
+                                    (self._yy, y * y)):
+            np.add.at(total, codes, contribution)
+
+        # Endpoints for the growth rate: the earliest and latest observed year of each series.
+        np.minimum.at(self._first_t, codes, np.where(present, t[:, None], np.inf))
+        np.maximum.at(self._last_t, codes, np.where(present, t[:, None], -np.inf))
+        for ends, end_t in ((self._first_y, self._first_t), (self._last_y, self._last_t)):
+            rows, cols = np.nonzero(present & (t[:, None] == end_t[codes]))
+            ends[codes[rows], cols] = values[rows, cols]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            det = self._n * self._tt - self._t * self._t
+            self.slope = (self._n * self._ty - self._t * self._y) / det
+            self.intercept = (self._y - self.slope * self._t) / self._n
+            residual = self._yy - self.intercept * self._y - self.slope * self._ty
+            self.spread = np.where(self._n > 2, np.sqrt(np.maximum(residual, 0) / (self._n - 2)), np.nan)
+            span = self._last_t - self._first_t
+            self.cagr = np.where(span > 0, (self._last_y / self._first_y) ** (1 / span) - 1, np.nan)
+
+    def table(self):
+        """Fitted parameters of every series: slope per year, value at `origin`, residual spread and CAGR."""
+        index = pd.MultiIndex.from_product([self.countries, self.metrics], names=['country', 'metric'])
+        return pd.DataFrame({'slope': self.slope.ravel(), 'intercept': self.intercept.ravel(),
+                             'spread': self.spread.ravel(), 'cagr': self.cagr.ravel(),
+                             'observations': self._n.ravel().astype(np.int64)}, index=index)
+
+    def line(self, country, metric, years, horizon=FORECAST_HORIZON):
+        """The trend over the inclusive (start, end) years, continued `horizon` years as a forecast.
+
+        Returns a frame with `year`, `trend`, and `lower` / `upper` bounds that are only set on
+        the forecast years. The forecast is only added when the range reaches the last observed
+        year; a range ending earlier gets the trend up to its end. The frame is empty when the
+        series has too few points for a line.
+        """
+        empty = pd.DataFrame(columns=['year', 'trend', 'lower', 'upper'])
+        if country not in self.countries or metric not in self._columns:
+            return empty
+        code, column = self.countries.get_loc(country), self._columns[metric]
+        slope, intercept, spread = self.slope[code, column], self.intercept[code, column], self.spread[code, column]
+        if not np.isfinite(slope):
+            return empty
+
+        last_year = int(self._last_t[code, column]) + self.origin
+        end = years[1] + horizon if years[1] >= last_year else years[1]
+        year = np.arange(years[0], end + 1)
+        trend = intercept + slope * (year - self.origin)
+        band = np.where(year > last_year, FORECAST_Z * spread, np.nan)
+        return pd.DataFrame({'year': year, 'trend': trend, 'lower': trend - band, 'upper': trend + band})
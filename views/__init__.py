@@ -0,0 +1,138 @@
+"""One module per dashboard view, each exposing `render(data, panel)`.
+
+midterm.py imports a view's module the first time it is selected, so a worker only pays for
+Plotly and the figure builders once someone opens a view that draws charts.
+
+Every widget is seeded from the URL query parameters and the view writes its state back, so a
+link reproduces the exact dashboard state. A view may also expose `warm(panel)`, which builds
+the figures of its default state. With SOCIOECON_WARM_FIGURES=1, `warm` runs it for every view
+in the background when a new panel is loaded, so the usual landing pages are served from the
+figure cache. It is off by default because it imports every view and competes with the first
+session on a cold worker.
+"""
+import importlib
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import TimeoutError
+
+import streamlit as st
+
+import background
+import profiling
+
+MODULES = {
+    "Documentation": 'views.documentation',
+    "Country View": 'views.country',
+    "Stats View": 'views.stats',
+    "Sandbox Mode": 'views.sandbox',
+}
+
+WARM_ENV_VAR = 'SOCIOECON_WARM_FIGURES'
+
+# Query parameters that hold dashboard state. `mirror` rewrites these and leaves every other
+# parameter, such as `debug`, as it is.
+STATE_KEYS = ('view', 'year', 'country', 'countries', 'years', 'metrics', 'log', 'trend', 'quality', 'method', 'focus')
+
+# How often a chart built in the background is checked while its placeholder is shown.
+POLL_INTERVAL = 0.25
+
+_warmed = weakref.WeakSet()
+_warm_lock = threading.Lock()
+
+
+def show_chart(build, *args, label=None, use_container_width=False, **kwargs):
+    label = label or build.__name__
+    with profiling.stage(f"build {label}"):
+        fig = build(*args, **kwargs)
+    with profiling.stage(f"emit {label}"):
+        st.plotly_chart(fig, use_container_width=use_container_width)
+
+
+def show_chart_later(build, *args, label=None, use_container_width=False):
+    """Like `show_chart`, but build the figure on the background pool behind a placeholder.
+
+    The placeholder is updated while waiting, which lets Streamlit stop this run as soon as
+    the user changes a widget; the next run then replaces the job.
+    """
+    label = label or build.__name__
+    future = background.submit(label, build, *args)
+    placeholder = st.empty()
+    start = time.monotonic()
+    with profiling.stage(f"wait {label}"):
+        while True:
+            try:
+                fig = future.result(timeout=POLL_INTERVAL)
+                break
+            except TimeoutError:
+                placeholder.info(f"Building chart... {time.monotonic() - start:.1f} s")
+    background.release(label, future)
+    with profiling.stage(f"emit {label}"):
+        placeholder.plotly_chart(fig, use_container_width=use_container_width)
+
+
+def seed(key, default, parse=str, valid=None):
+    """Set widget `key` from the URL query parameters the first time this session draws it.
+
+    A list or tuple default reads every value of a repeated parameter. Values that do not
+    parse or fail `valid` fall back to `default`, so a stale link still renders.
+    """
+    if key in st.session_state:
+        return
+    value = default
+    try:
+        if isinstance(default, (list, tuple)):
+            if st.query_params.get_all(key):
+                value = type(default)(parse(raw) for raw in st.query_params.get_all(key))
+        elif key in st.query_params:
+            value = parse(st.query_params[key])
+    except ValueError:
+        value = default
+    if valid is not None and not valid(value):
+        value = default
+    st.session_state[key] = value
+
+
+def mirror(view, **params):
+    """Replace the state query parameters with the view and every widget value off its default.
+
+    Each keyword is a (value, default) pair; leaving defaults out keeps the URL of a given
+    state canonical and short. Parameters outside `STATE_KEYS` are kept.
+    """
+    query = {'view': [view]}
+    for key, (value, default) in params.items():
+        if isinstance(value, (list, tuple)):
+            if list(value) != list(default):
+                query[key] = [str(item) for item in value]
+        elif value != default:
+            query[key] = [str(int(value)) if isinstance(value, bool) else str(value)]
+
+    # Only touch the URL when the state changed, so an ordinary rerun sends no update.
+    owned = set(STATE_KEYS) | set(query)
+    if {key: st.query_params.get_all(key) for key in st.query_params if key in owned} != query:
+        for key in [key for key in st.query_params if key in owned]:
+            del st.query_params[key]
+        for key, value in query.items():
+            st.query_params[key] = value
+
+
+def warm(panel):
+    """Build every view's default figures for `panel` on a background thread, once per panel.
+
+    Does nothing unless WARM_ENV_VAR is set.
+    """
+    if os.environ.get(WARM_ENV_VAR, '') in ('', '0'):
+        return
+    with _warm_lock:
+        if panel in _warmed:
+            return
+        _warmed.add(panel)
+
+    def run():
+        for name in MODULES.values():
+            module = importlib.import_module(name)
+            if hasattr(module, 'warm'):
+                module.warm(panel)
+
+    threading.Thread(target=run, name='warm-figures', daemon=True).start()
@@ -0,0 +1,87 @@
+"""Country View: KPIs, breakdowns and trends for one country and year."""
+import streamlit as st
+
+import figures
+from views import mirror, seed, show_chart
+
+
+def warm(panel):
+    country, year = panel.countries[0], panel.years[0]
+    if panel.row(country, year) is not None:
+        for build in figures.COUNTRY_YEAR_CHARTS:
+            build(panel, country, year)
+    for build in figures.COUNTRY_CHARTS:
+        build(panel, country)
+
+
+def render(data, panel):
+    st.subheader("Country View")
+    seed('year', panel.years[0], parse=int, valid=lambda value: value in panel.years)
+    seed('country', panel.countries[0], valid=lambda value: value in panel.countries)
+    year = st.selectbox("Select a Year:", panel.years, key='year')
+    country = st.selectbox("Select a Country:", panel.countries, key='country')
+    mirror("Country View", year=(year, panel.years[0]), country=(country, panel.countries[0]))
+
+    selected_row = panel.row(country, year)
+
+    st.subheader("Key Metrics")
+    if selected_row is not None:
+        metrics = {label: selected_row[column] for label, column in figures.COUNTRY_KPIS.items()}
+
+        cols = st.columns(4)
+        for i, (metric_name, metric_value) in enumerate(metrics.items()):
+            with cols[i]:
+                st.markdown(f"<div style='background-color: blue; color: white; padding: 20px; border-radius: 5px; text-align: center;'>{metric_name}: {metric_value}</div>", unsafe_allow_html=True)
+    else:
+        st.info(f"There is no data for {country} in {year}.")
+
+    # # Second Row: Line Charts for Trends Over Years
+    # st.subheader("Trends Over Years")
+    # trend_cols = st.columns(3)
+
+    # # Line chart for GDP per Capita
+    # with trend_cols[0]:
+    #     gdp_line_fig = px.line(data[data['country'] == country], x='year', y='gdp_per_capita_usd', 
+    #                             title="GDP per Capita (USD) Over Years")
+    #     st.plotly_chart(gdp_line_fig, use_container_width=True)
+
+    # # Line chart for Population
+    # with trend_cols[1]:
+    #     population_line_fig = px.line(data[data['country'] == country], x='year', y='population_millions', 
+    #                                    title="Population (Millions) Over Years")
+    #     st.plotly_chart(population_line_fig, use_container_width=True)
+
+    # # Line chart for Life Expectancy
+    # with trend_cols[2]:
+    #     life_expectancy_line_fig = px.line(data[data['country'] == country], x='year', y='life_expectancy_years', 
+    #                                         title="Life Expectancy (Years) Over Years")
+    #     st.plotly_chart(life_expectancy_line_fig, use_container_width=True)
+
+    # Deltas can add years for some countries only, so the year's breakdowns may not exist.
+    if selected_row is not None:
+        st.subheader("Distribution Insights")
+        pie_cols = st.columns(3)
+
+        with pie_cols[0]:
+            show_chart(figures.energy_pie, panel, country, year, use_container_width=True)
+
+        with pie_cols[1]:
+            show_chart(figures.expenditure_pie, panel, country, year, use_container_width=True)
+
+        with pie_cols[2]:
+            show_chart(figures.sectors_pie, panel, country, year, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        show_chart(figures.adoption_bar, panel, country, use_container_width=True)
+    with col2:
+        show_chart(figures.imports_exports_bar, panel, country, use_container_width=True)
+
+    st.subheader("HDI and Various Indices Over Years")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        show_chart(figures.hdi_line, panel, country, use_container_width=True)
+    with col2:
+        show_chart(figures.indices_line, panel, country, use_container_width=True)
@@ -0,0 +1,130 @@
+"""Documentation: what the dashboard shows and where the data comes from."""
+import streamlit as st
+
+from views import mirror
+
+
+def render(data, panel):
+    mirror("Documentation")
+    st.subheader("Documentation")
+    doc_text = """
+    # Dashboard Documentation
+
+    ## Disclaimer:
+
+    I think it is pertinent to inform the users of the source of the information, and its genuinity. This project is aimed at highlighting the use of Streamlit in a data-wrapped world.
+    The intent for this dashboard is to act as a reference to be used in real-world dashboards and in no way, expected to imply any information from this dataset. Here's why:
+    
+    1. I have sourced this data from [Kaggle](https://www.kaggle.com/datasets/waqi786/country-comparison-dataset-usa-and-more/data), and joined this 
+    data with the UN data archives for Import-Export data and Economic Contributions for each country. 
+    2. However, unfortunately, the data that was sourced from Kaggle has been filled with wrong data based on real life estimates, making the whole analysis unreliable. 
+    3. Please feel free to explore, and use any ideas that you gain from this dashboarding demonstration. 
+    4. Do not draw insights out of this data. Any and all insights you see are just estimates of real life data, but do not, in any way, represent the actual data. Doing so would create
+    undeserved bias towards countries and goes against the goal of this project.
+    
+    Finally, human emphasis on any dashboard delivers the right message. This dashboard will only act as that assisting tool to tell the story, and is not supposed to be self-explanatory
+    in any sense. Presenters are expected to deliver the message by using the visualizations within this dataset, and this dashboard provides full freedom to do so. 
+
+    ## Overview
+    This dashboard provides a comprehensive view of various indicators across multiple countries over time. Users can explore different metrics, visualize relationships between them, 
+    and gain insights into trends and patterns in data.
+
+    ## Navigation
+    The dashboard consists of three main views:
+
+    1. **Country View**
+    2. **Stats View**
+    3. **Sandbox Mode**
+
+    ---
+
+    ### 1. Country View
+    The Country View allows users to explore key performance indicators (KPIs) for each country in a specific year.
+
+    #### Features:
+    - **Country Selection**: Users can select a specific country from a dropdown menu.
+    - **Year Selection**: A slider is provided to filter data based on the selected year.
+    - **KPIs Display**: The following key performance indicators are displayed in square blocks:
+      - GDP per Capita
+      - Population
+      - Life Expectancy
+      - CO2 Emissions
+    - **Pie Charts**:
+      - Energy Consumption - Renewable vs Non-renewable
+      - Expenditure - HealthCare vs Education vs Military vs Others
+      - Economic Sector Distribution - Gross Contribution. 
+    - **Bar Charts**:
+      - Internet Penetrations and Smartphone Adoptions
+      - Imports vs Exports
+    - **Line Graphs**:
+      - Comparison of Social Indicators, each with its dashed linear trend and a shaded five-year forecast.
+    
+    ---
+    
+    ### 2. Stats View
+    The Stats View provides an analytical perspective on the relationships between various metrics across selected countries.
+    
+    #### Features:
+    - **Country Selection**: All countries are selected by default, with an option for users to remove any countries from the selection.
+    - **Year Slider**: Users can specify a range of years to filter the data.
+    - **Correlations**: A heatmap of the Pearson or Spearman correlation between every pair of metrics, and a ranked list of the strongest relationships (with their regression fit) across all selected countries or within one of them.
+    - **Predetermined Graphs**: The following relationships are visualized:
+      - **First Row**:
+        - Population Growth Rate vs. Unemployment Rate
+        - Poverty Rate vs. Unemployment Rate 
+      - **Second Row**:
+        - CO2 Emissions vs. Forest Coverage
+        - CO2 Emissions vs. Energy Consumption
+      - **Third Row**:
+        - Poverty Rate vs. Military Expenditure
+        - Poverty Rate vs. Inflation Rate
+      - **Fourth Row**:
+        - Corruption Perception Index vs. Freedom of Press (Scatter Plot)
+        - Average Voting Participation Rate (Bar Chart sorted by average participation)
+    
+    ---
+    
+    ### 3. Sandbox Mode
+    The Sandbox Mode offers a flexible environment for users to explore multiple metrics simultaneously.
+    
+    #### Features:
+    - **Metric Selection**: Users can select from all available metrics, with the ability to select one, two, or three metrics for analysis.
+    - **Country Selection**: Similar to other views, users can select specific countries and a year range.
+    - **Visualizations**:
+      - **One Metric**: Displays a line chart of the metric over the years and a pie chart showing the average value of the metric for selected years. The line chart can overlay each country's trend and forecast.
+      - **Two Metrics**: Shows a scatter plot comparing the two selected metrics, with hue representing the country.
+      - **Three Metrics**: Displays a 3D scatter plot of the three selected metrics, again with hue representing the country.
+      - **More than 3 Metrics**: Displays a parallel plot that allows users to play around with the data. Hue still represents country.
+    - **Log Scale Filter**: An option to apply log scaling to the y-axis for better interpretation of data distributions.
+    - **Flagged Data Points**: Show, mark or hide the points whose values failed a data-quality check (see below). Hidden points are also left out of the average pie chart. Parallel plots can only hide them.
+    
+    ---
+
+    ### Data Quality
+    Every value is checked once when the data loads, and suspicious ones are flagged rather than changed:
+    - **Range**: percentages outside 0-100 (such as a literacy rate above 100), indices outside their scale, and negative amounts (such as a negative remaining GDP per capita).
+    - **Monotonicity**: road network length and internet penetration dropping sharply from one year to the next.
+    - **Sector Shares**: agriculture, industry and services shares of gross value added that do not add up to 100.
+    - **Mixed Scales**: doctor-to-patient ratios and active military personnel jumping by an order of magnitude from one year to the next within a country, a sign of mixed units.
+    - **Consistency**: UN trade figures out of proportion with the Kaggle GDP, and GDP that does not match GDP per capita times population.
+
+    The number of flagged values in the current data is listed at the bottom of this page.
+    
+    ---
+    
+    ### Conclusion
+    This dashboard serves as a valuable tool for exploring and analyzing the complex relationships between various economic and social indicators across different countries and time periods. Users are encouraged to interact with the data and gain insights relevant to their areas of interest.
+
+    #### Authors - Vaibhav Reddy Vennam. 
+    
+    You can find this whole project on my [GitHub](https://github.com/Vennamm/SocioEconomic-Analysis-of-Developing-Countries/tree/main). Feel free to contact me on GitHub or my [email](mailto:vaibhav.vennam@gmail.com), if you would like me to add more visualizations :)
+    """
+
+    st.markdown(doc_text)
+
+    with st.expander("Data quality flags in the current data"):
+        summary = panel.quality.summary()
+        if summary.empty:
+            st.write("No values are flagged.")
+        else:
+            st.dataframe(summary, use_container_width=True)
@@ -0,0 +1,71 @@
+"""Sandbox Mode: charts of whichever metrics the user picks."""
+import streamlit as st
+
+import figures
+from views import mirror, seed, show_chart, show_chart_later
+
+
+def render(data, panel):
+    st.subheader("Sandbox Mode")
+
+    min_year, max_year = int(panel.years[0]), int(panel.years[-1])
+    metrics = panel.metrics
+    seed('countries', list(panel.countries), valid=lambda value: set(value) <= set(panel.countries))
+    seed('years', (min_year, max_year), parse=int,
+         valid=lambda value: len(value) == 2 and min_year <= value[0] <= value[1] <= max_year)
+    seed('metrics', [], valid=lambda value: set(value) <= set(metrics))
+    seed('log', False, parse=lambda value: value == '1')
+    seed('trend', False, parse=lambda value: value == '1')
+    # The radio shows the labels (AppTest cannot drive one with format_func); the URL keeps the mode.
+    quality_labels = {label: mode for mode, label in figures.QUALITY_MODES.items()}
+    seed('quality', figures.QUALITY_MODES['show'], parse=lambda value: figures.QUALITY_MODES.get(value, ''),
+         valid=lambda value: value in quality_labels)
+
+    countries = tuple(st.multiselect("Select Countries", options=panel.countries, key='countries'))
+    years = st.slider("Select Year Range", min_value=min_year, max_value=max_year, key='years')
+    
+    selected_metrics = st.multiselect("Select Metrics", metrics, key='metrics')
+    if selected_metrics:
+        quality = quality_labels[st.radio("Flagged Data Points", list(quality_labels), horizontal=True, key='quality')]
+
+    if len(selected_metrics) == 1:
+        log_scale = st.checkbox("Apply Log Scale to Y-Axis", key='log')
+        show_trend = st.checkbox("Show Trend and Forecast", key='trend')
+        metric = selected_metrics[0]
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            show_chart(figures.metric_line, panel, countries, years, metric, log_scale, show_trend, quality,
+                       use_container_width=True)
+    
+        with col2:
+            show_chart(figures.metric_average_pie, panel, countries, years, metric, quality, use_container_width=True)
+    
+    elif len(selected_metrics) == 2:
+        log_scale = st.checkbox("Apply Log Scale to Y-Axis", key='log')
+        
+        x_metric, y_metric = selected_metrics
+    
+        show_chart(figures.metric_scatter, panel, countries, years, x_metric, y_metric, log_scale, quality, use_container_width=True)
+    
+    elif len(selected_metrics) == 3:
+        x_metric, y_metric, z_metric = selected_metrics
+
+        show_chart_later(figures.metric_scatter_3d, panel, countries, years, x_metric, y_metric, z_metric, quality,
+                         use_container_width=True)
+    
+    elif len(selected_metrics) > 3:
+        # The button only triggers a rerun, which redraws the plot without any axis brushing.
+        st.button('Reset Selection')
+
+        show_chart_later(figures.parallel_coordinates, panel, countries, years, tuple(selected_metrics), quality,
+                         use_container_width=True)
+        # experiment = hip.Experiment.from_dataframe(hiplot_data)
+
+        # hip_exp = hip.Experiment.display_st(experiment)
+
+    mirror("Sandbox Mode", countries=(countries, panel.countries), years=(years, (min_year, max_year)),
+           metrics=(selected_metrics, []), log=(len(selected_metrics) in (1, 2) and st.session_state.get('log', False), False),
+           trend=(len(selected_metrics) == 1 and st.session_state.get('trend', False), False),
+           quality=(quality if selected_metrics else 'show', 'show'))
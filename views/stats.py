@@ -0,0 +1,94 @@
+"""Stats View: correlations and fixed relationships between metrics for the selected countries and years."""
+import streamlit as st
+
+import correlations
+import figures
+import profiling
+from views import mirror, seed, show_chart
+
+
+def full_range(panel):
+    return int(panel.years[0]), int(panel.years[-1])
+
+
+def warm(panel):
+    countries, years = tuple(panel.countries), full_range(panel)
+    for x, y, title, options in figures.STATS_SCATTERS.values():
+        figures.stats_scatter(panel, countries, years, x, y, title, **options)
+    figures.voting_bar(panel, years)
+    figures.correlation_heatmap(panel, countries, years, 'pearson')
+
+
+def scatter(label, panel, countries, years, use_container_width=False):
+    x, y, title, options = figures.STATS_SCATTERS[label]
+    show_chart(figures.stats_scatter, panel, countries, years, x, y, title, **options,
+               label=label, use_container_width=use_container_width)
+
+
+def render(data, panel):
+    st.subheader("Stats View")
+    
+    all_countries = panel.countries
+    min_year, max_year = full_range(panel)
+    seed('countries', list(all_countries), valid=lambda value: set(value) <= set(all_countries))
+    seed('years', (min_year, max_year), parse=int,
+         valid=lambda value: len(value) == 2 and min_year <= value[0] <= value[1] <= max_year)
+
+    selected_countries = tuple(st.multiselect("Select Countries:", options=all_countries, key='countries'))
+    selected_years = st.slider("Select Year Range:", min_value=min_year, max_value=max_year, key='years')
+
+    st.subheader("Correlations")
+    # Options are the labels themselves (AppTest cannot drive a radio with format_func); the URL keeps lower case.
+    seed('method', 'Pearson', parse=str.title, valid=lambda value: value in ('Pearson', 'Spearman'))
+    method = st.radio("Correlation:", ['Pearson', 'Spearman'], horizontal=True, key='method').lower()
+    show_chart(figures.correlation_heatmap, panel, selected_countries, selected_years, method, use_container_width=True)
+
+    focus_options = [correlations.ALL] + list(selected_countries)
+    seed('focus', correlations.ALL, valid=lambda value: value in focus_options)
+    if st.session_state['focus'] not in focus_options:
+        # The focused country was just deselected.
+        st.session_state['focus'] = correlations.ALL
+    focus = st.selectbox("Strongest relationships for:", focus_options, key='focus')
+    with profiling.stage("rank relationships"):
+        st.dataframe(correlations.strongest(panel, selected_countries, selected_years, method, focus)
+                     .drop(columns='country'),
+                     hide_index=True, use_container_width=True)
+
+    mirror("Stats View", countries=(selected_countries, all_countries), years=(selected_years, (min_year, max_year)),
+           method=(method, 'pearson'), focus=(focus, correlations.ALL))
+
+    st.subheader("Unemployment Insights")
+    unemployment_cols = st.columns(2)
+
+    with unemployment_cols[0]:
+        scatter('pop_unemp', panel, selected_countries, selected_years)
+
+    with unemployment_cols[1]:
+        scatter('pov_unemp', panel, selected_countries, selected_years)
+
+    st.subheader("CO2 Emissions Insights")
+    co2_cols = st.columns(2)
+
+    with co2_cols[0]:
+        scatter('co2_forest', panel, selected_countries, selected_years, use_container_width=True)
+
+    with co2_cols[1]:
+        scatter('co2_energy', panel, selected_countries, selected_years, use_container_width=True)
+
+    st.subheader("Poverty Rate Insights")
+    poverty_cols = st.columns(2)
+
+    with poverty_cols[0]:
+        scatter('pov_military', panel, selected_countries, selected_years)
+
+    with poverty_cols[1]:
+        scatter('pov_inf', panel, selected_countries, selected_years)
+
+    st.subheader("Corruption Insights")
+    corruption_cols = st.columns(2)
+    
+    with corruption_cols[0]:
+        scatter('corruption', panel, selected_countries, selected_years)
+
+    with corruption_cols[1]:
+        show_chart(figures.voting_bar, panel, selected_years)